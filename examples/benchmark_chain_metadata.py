@@ -0,0 +1,72 @@
+"""
+Benchmark of per-call latency with and without cache_chain_metadata.
+
+Runs sequential `increment` calls against the counter contract on a local
+sandbox, once with py-near's default per-account bookkeeping and once with
+the client's local nonce and block-hash caches, and prints latency stats.
+
+Usage:
+    python examples/benchmark_chain_metadata.py [--calls 200] [--wasm PATH]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from near_pytest import NearClient, SandboxManager, compile_contract
+
+
+def run(sandbox: SandboxManager, wasm_path: Path, calls: int, cache: bool):
+    """Time sequential contract calls, returning the latencies in ms"""
+    client = NearClient(
+        sandbox.rpc_endpoint(),
+        "test.near",
+        sandbox.get_validator_key(),
+        cache_chain_metadata=cache,
+    )
+    label = "cached" if cache else "default"
+    account_id = client.create_account(f"bench-{label}")
+    client.deploy_contract(account_id, wasm_path)
+
+    # Warm up the account's key and block hash lookups
+    client.call_function(account_id, account_id, "increment")
+
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client.call_function(account_id, account_id, "increment")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<28} mean {statistics.mean(latencies):7.2f} ms  "
+        f"p50 {statistics.median(latencies):7.2f} ms  p95 {p95:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--wasm", type=Path, help="Precompiled counter contract")
+    args = parser.parse_args()
+
+    wasm_path = args.wasm or compile_contract(
+        Path(__file__).parent / "counter_contract" / "__init__.py", single_file=True
+    )
+
+    sandbox = SandboxManager()
+    sandbox.start()
+    try:
+        report("cache_chain_metadata=False", run(sandbox, wasm_path, args.calls, False))
+        report("cache_chain_metadata=True", run(sandbox, wasm_path, args.calls, True))
+    finally:
+        sandbox.stop()
+
+
+if __name__ == "__main__":
+    main()
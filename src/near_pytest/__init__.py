@@ -4,10 +4,12 @@ near-pytest: A pytest-native approach for testing NEAR smart contracts in Python
 
 # Import main components to expose them at the package level
 from .testing import NearTestCase
-from .client import NearClient
+from .client import NearClient, AsyncNearClient
 from .models import Account, Contract, ContractCallError
 from .sandbox import SandboxManager
-from .compiler import compile_contract
+from .pool import SandboxPool
+from .compiler import compile_contract, compile_contracts
+from .remote_cache import DirectoryCacheBackend, HttpCacheBackend, set_remote_cache
 from . import fixtures
 
 __version__ = "0.1.0"
@@ -15,10 +17,16 @@ __version__ = "0.1.0"
 __all__ = [
     "NearTestCase",
     "NearClient",
+    "AsyncNearClient",
     "Account",
     "Contract",
     "ContractCallError",
     "SandboxManager",
+    "SandboxPool",
     "compile_contract",
+    "compile_contracts",
+    "DirectoryCacheBackend",
+    "HttpCacheBackend",
+    "set_remote_cache",
     "fixtures",
 ]
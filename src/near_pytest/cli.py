@@ -0,0 +1,70 @@
+# near_pytest/cli.py
+"""Command line interface for near-pytest maintenance tasks."""
+
+import os
+import sys
+import argparse
+from typing import List, Optional
+
+from .compiler import (
+    CACHE_MAX_AGE_DAYS_ENV,
+    CACHE_MAX_BYTES_ENV,
+    CompilerError,
+    parse_size,
+    prune_cache,
+)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(prog="near-pytest")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cache = commands.add_parser("cache", help="Manage the compiled contract cache")
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+
+    prune = cache_commands.add_parser("prune", help="Evict compiled contracts")
+    prune.add_argument(
+        "--max-bytes",
+        default=os.environ.get(CACHE_MAX_BYTES_ENV),
+        help=f"Maximum cache size, e.g. 500M (default: ${CACHE_MAX_BYTES_ENV})",
+    )
+    prune.add_argument(
+        "--max-age",
+        type=float,
+        default=os.environ.get(CACHE_MAX_AGE_DAYS_ENV),
+        help=f"Maximum days since last use (default: ${CACHE_MAX_AGE_DAYS_ENV})",
+    )
+    prune.add_argument(
+        "--stale",
+        action="store_true",
+        help="Also remove builds whose contract sources changed or were deleted",
+    )
+    prune.add_argument(
+        "--dry-run", action="store_true", help="Only list what would be removed"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the near-pytest command line"""
+    args = _build_parser().parse_args(argv)
+
+    try:
+        removed = prune_cache(
+            max_bytes=parse_size(args.max_bytes) if args.max_bytes else None,
+            max_age=args.max_age * 86400 if args.max_age is not None else None,
+            stale=args.stale,
+            dry_run=args.dry_run,
+        )
+    except CompilerError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    for wasm_path in removed:
+        print(wasm_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
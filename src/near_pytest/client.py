@@ -1,89 +1,407 @@
+import os
+import json
+import time
 import asyncio
-from typing import Any, Dict, Optional, Union
+import base64
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from pathlib import Path
 
+from py_near import transactions
 from py_near.account import Account as PyNearAccount
 from py_near.constants import DEFAULT_ATTACHED_GAS
+from py_near.exceptions.provider import InternalError, InvalidNonce, RPCTimeoutError
 from py_near.models import TransactionResult
+from py_near.providers import JsonProvider
 from nacl.signing import SigningKey
 import base58
 
+from . import state
+from .nonce import BlockHashCache, NonceKey, NonceManager
+from .view_cache import ViewCache
+
+# Import logger
+from .utils import logger
+
+# Attempts for a transaction that lost a nonce race to a concurrent one
+NONCE_RETRIES = 3
+
+# Environment variable enabling cache_chain_metadata by default
+CACHE_CHAIN_METADATA_ENV = "NEAR_PYTEST_CACHE_CHAIN_METADATA"
+
+# Environment variable enabling cache_views by default
+CACHE_VIEWS_ENV = "NEAR_PYTEST_CACHE_VIEWS"
+
+# Seconds to wait for the outcome of a broadcast transaction, and between polls
+OUTCOME_TIMEOUT = 60.0
+OUTCOME_POLL_INTERVAL = 0.1
+
+
+# Total size of WASM files kept in memory by _read_wasm
+WASM_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# WASM file contents by (path, mtime_ns, size), least recently used first
+_wasm_cache: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_wasm_cache_bytes = 0
+_wasm_cache_lock = threading.Lock()
+
+
+def _read_wasm(wasm_file: Union[str, bytes, Path]) -> bytes:
+    """Get the contract code, reading it from disk if a path is provided
+
+    File contents are cached by path, modification time and size, so
+    deploying the same artifact repeatedly shares one immutable buffer.
+    """
+    global _wasm_cache_bytes
+
+    if not isinstance(wasm_file, (str, Path)):
+        return wasm_file
+
+    path = os.path.abspath(wasm_file)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _wasm_cache_lock:
+        code = _wasm_cache.get(key)
+        if code is not None:
+            _wasm_cache.move_to_end(key)
+            return code
+
+    with open(path, "rb") as f:
+        code = f.read()
+
+    if len(code) <= WASM_CACHE_MAX_BYTES:
+        with _wasm_cache_lock:
+            # Drop earlier versions of the same file
+            for old_key in [k for k in _wasm_cache if k[0] == path and k != key]:
+                _wasm_cache_bytes -= len(_wasm_cache.pop(old_key))
+            if key not in _wasm_cache:
+                _wasm_cache[key] = code
+                _wasm_cache_bytes += len(code)
+            while _wasm_cache_bytes > WASM_CACHE_MAX_BYTES:
+                _, evicted = _wasm_cache.popitem(last=False)
+                _wasm_cache_bytes -= len(evicted)
+    return code
+
+
+def _generate_key_pair():
+    """Generate an ed25519 key pair as (public_key, private_key) strings"""
+    key_pair = SigningKey.generate()
+    public_key = "ed25519:" + base58.b58encode(bytes(key_pair.verify_key)).decode(
+        "utf-8"
+    )
+    expanded_key = key_pair._signing_key
+    private_key = "ed25519:" + base58.b58encode(expanded_key).decode("utf-8")
+    return public_key, private_key
 
-class NearClient:
-    """A simplified client that manages both sandbox and account operations"""
 
-    def __init__(self, rpc_endpoint: str, master_account_id: str, master_key: str):
+class _JsonProvider(JsonProvider):
+    """JSON-RPC provider whose shutdown closes its HTTP client"""
+
+    async def shutdown(self):
+        # py-near's shutdown leaves the connection pool open
+        await self._client.aclose()
+
+
+class _Account(PyNearAccount):
+    """A py-near Account signing through an existing provider
+
+    py-near's constructor builds a provider, and with it an HTTP connection
+    pool, for every account; this one shares the client's provider instead.
+    """
+
+    def __init__(self, account_id: str, private_key: str, provider: JsonProvider):
+        self._provider = provider
+        self.account_id = account_id
+
+        pk = base58.b58decode(private_key.replace("ed25519:", ""))
+        self._free_signers = asyncio.Queue()
+        self._free_signers.put_nowait(pk)
+        self._signers = [pk]
+        # Keyed by VerifyKey like py-near's, despite its annotation
+        public_key: Any = SigningKey(pk[:32]).verify_key
+        self._signer_by_pk = {public_key: pk}
+
+
+class AsyncNearClient:
+    """An async client for account operations, bound to the running event loop
+
+    Coroutines from this client can be awaited together (e.g. with
+    ``asyncio.gather``) to submit independent transactions concurrently.
+    """
+
+    def __init__(
+        self,
+        rpc_endpoint: str,
+        master_account_id: str,
+        master_key: str,
+        keys: Optional[Dict[str, str]] = None,
+        code_registry: Optional[Dict[str, str]] = None,
+        nonces: Optional[Dict[NonceKey, int]] = None,
+        cache_chain_metadata: bool = False,
+        view_cache: Optional[ViewCache] = None,
+    ):
         self.rpc_endpoint = rpc_endpoint
         self.master_account_id = master_account_id
         self.master_key = master_key
         self._accounts: Dict[str, PyNearAccount] = {}  # Cache of accounts
+        self._started: Set[str] = set()  # Accounts that ran py-near's startup
 
-        # Initialize the event loop once
-        self._loop = asyncio.new_event_loop()
+        # One RPC provider for all accounts, so they share a keep-alive pool
+        self._provider: JsonProvider = _JsonProvider(rpc_endpoint)
 
-        # Initialize master account
-        self._master_account = self._get_or_create_account(
-            master_account_id, master_key
+        # Private keys by account ID, shareable between clients
+        self._keys: Dict[str, str] = keys if keys is not None else {}
+        self._keys[master_account_id] = master_key
+
+        # Account that first deployed each contract code, by code hash
+        self._code_registry: Dict[str, str] = (
+            code_registry if code_registry is not None else {}
         )
 
-    def __del__(self):
-        """Clean up resources"""
-        if hasattr(self, "_loop") and self._loop and not self._loop.is_closed():
-            self._loop.close()
+        # Locally tracked nonces (shareable between clients) and block hash
+        self._nonces = NonceManager(nonces)
+        self._block_hash = BlockHashCache()
 
-    def _run_async(self, coro) -> Any:
-        """Simplified method to run async code synchronously"""
-        return self._loop.run_until_complete(coro)
+        # Whether single transactions also sign through the local caches
+        self.cache_chain_metadata = cache_chain_metadata
 
-    def _get_or_create_account(
+        # View results reused until the chain moves on (shareable between
+        # clients); views aren't cached without one
+        self._view_cache = view_cache
+
+    async def _get_or_create_account(
         self, account_id: str, private_key: Optional[str] = None
     ) -> PyNearAccount:
-        """Get or create a py-near Account"""
+        """Get or create a py-near Account
+
+        The account's startup is deferred until it first signs through
+        py-near, so accounts that only receive or view cost no RPC here.
+        """
         if account_id in self._accounts:
             return self._accounts[account_id]
 
-        # Generate a key pair if not provided
+        # Use a known key, generating a key pair if there is none
+        private_key = private_key or self._keys.get(account_id)
         if private_key is None:
-            key_pair = SigningKey.generate()
-            expanded_key = key_pair._signing_key
-            private_key = "ed25519:" + base58.b58encode(expanded_key).decode("utf-8")
+            _, private_key = _generate_key_pair()
+        self._keys[account_id] = private_key
 
-        # Create and initialize the account
-        account = PyNearAccount(account_id, private_key, rpc_addr=self.rpc_endpoint)
-        self._run_async(account.startup())
+        # Create the account
+        account = _Account(account_id, private_key, self._provider)
         self._accounts[account_id] = account
 
         return account
 
-    # Core operations
+    async def close(self):
+        """Close the RPC provider's connections"""
+        await self._provider.shutdown()
 
-    def create_account(self, name: str, initial_balance: Optional[int] = None) -> str:
-        """Create a new account as a subaccount of the master account"""
-        account_id = f"{name}.{self.master_account_id}"
+    async def _get_master_account(self) -> PyNearAccount:
+        """Get the master account"""
+        return await self._get_or_create_account(
+            self.master_account_id, self.master_key
+        )
+
+    async def _start_account(self, account: PyNearAccount):
+        """Run py-near's startup for an account about to sign through it"""
+        if account.account_id not in self._started:
+            await account.startup()
+            self._started.add(account.account_id)
 
-        # Generate new key pair
-        key_pair = SigningKey.generate()
-        public_key = "ed25519:" + base58.b58encode(bytes(key_pair.verify_key)).decode(
-            "utf-8"
+    async def _sign_transaction(
+        self, account: PyNearAccount, receiver_id: str, actions: list
+    ) -> Tuple[str, str]:
+        """Sign a transaction with a locally reserved nonce
+
+        Returns:
+            The transaction hash and the serialized signed transaction
+        """
+        self._invalidate_views()
+        pk = account._signers[0]
+        nonce = await self._nonces.next(account, pk)
+        block_hash = await self._block_hash.get(account.provider)
+        trx_hash = transactions.calc_trx_hash(
+            account.account_id, pk, receiver_id, nonce, actions, block_hash
+        )
+        serialized_tx = transactions.sign_and_serialize_transaction(
+            account.account_id, pk, receiver_id, nonce, actions, block_hash
         )
-        expanded_key = key_pair._signing_key
-        private_key = "ed25519:" + base58.b58encode(expanded_key).decode("utf-8")
+        return trx_hash, serialized_tx
 
-        # Create the account using master account
-        self._run_async(
-            self._master_account.create_account(
-                account_id,
-                public_key,
-                initial_balance or 10_000_000_000_000_000_000_000_000,
+    async def _submit_concurrent(
+        self, account: PyNearAccount, receiver_id: str, actions: list
+    ) -> TransactionResult:
+        """Sign and submit a transaction alongside others from the same key
+
+        The nonce is reserved before any await, so concurrent submissions get
+        distinct nonces. A transaction that lands after a higher nonce from
+        the same key is re-signed with a fresh nonce.
+        """
+        attempts = 0
+        try:
+            while True:
+                trx_hash, serialized_tx = await self._sign_transaction(
+                    account, receiver_id, actions
+                )
+                try:
+                    return await account.provider.send_tx_and_wait(
+                        serialized_tx, trx_hash=trx_hash, receiver_id=receiver_id
+                    )
+                except InvalidNonce:
+                    attempts += 1
+                    if attempts >= NONCE_RETRIES:
+                        raise
+                    await self._nonces.resync(account, account._signers[0])
+        finally:
+            # Views fetched while the transaction was in flight may predate it
+            self._invalidate_views()
+
+    async def _submit(
+        self, account: PyNearAccount, receiver_id: str, actions: list
+    ) -> Union[TransactionResult, str]:
+        """Sign and submit a transaction, waiting for its outcome
+
+        Submissions from one account may run concurrently: they get distinct
+        nonces, and a rejected nonce is resynced and the transaction retried.
+        """
+        if self.cache_chain_metadata:
+            return await self._submit_concurrent(account, receiver_id, actions)
+        pk = account._signers[0]
+        self._invalidate_views()
+        try:
+            await self._start_account(account)
+            attempts = 0
+            while True:
+                # py-near counts nonces itself once it knows the chain's
+                await self._nonces.sync(account, pk)
+                try:
+                    return await account.sign_and_submit_tx(receiver_id, actions)
+                except InvalidNonce:
+                    attempts += 1
+                    if attempts >= NONCE_RETRIES:
+                        raise
+                    await self._nonces.resync(account, pk)
+        finally:
+            # Views fetched while the transaction was in flight may predate it
+            self._invalidate_views()
+
+    async def _broadcast(
+        self, account: PyNearAccount, receiver_id: str, actions: list
+    ) -> str:
+        """Sign and send a transaction without waiting for it to execute
+
+        The node still validates the transaction, so a rejected nonce is
+        retried here rather than surfacing when awaiting the outcome.
+        """
+        attempts = 0
+        while True:
+            trx_hash, serialized_tx = await self._sign_transaction(
+                account, receiver_id, actions
             )
+            try:
+                await account.provider.json_rpc(
+                    "send_tx", {"signed_tx_base64": serialized_tx, "wait_until": "NONE"}
+                )
+                return trx_hash
+            except InvalidNonce:
+                attempts += 1
+                if attempts >= NONCE_RETRIES:
+                    raise
+                await self._nonces.resync(account, account._signers[0])
+
+    async def _wait_for_outcome(
+        self, account: PyNearAccount, trx_hash: str
+    ) -> TransactionResult:
+        """Wait for a broadcast transaction to execute"""
+        deadline = time.monotonic() + OUTCOME_TIMEOUT
+        while True:
+            try:
+                result = await account.provider.json_rpc(
+                    "tx",
+                    {
+                        "tx_hash": trx_hash,
+                        "sender_account_id": account.account_id,
+                        "wait_until": "EXECUTED_OPTIMISTIC",
+                    },
+                )
+                self._invalidate_views()
+                return TransactionResult(**result)
+            except (RPCTimeoutError, InternalError):
+                # Not known to the node yet, or still executing
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(OUTCOME_POLL_INTERVAL)
+
+    # Core operations
+
+    async def create_accounts(
+        self, names: List[str], initial_balance: Optional[int] = None
+    ) -> List[str]:
+        """
+        Create many subaccounts of the master account concurrently
+
+        Each account gets a single CreateAccount + AddKey + Transfer
+        transaction. The transactions are signed with consecutive nonces of
+        the master key and submitted together. The new accounts are only
+        registered locally; nothing else is fetched for them.
+
+        Args:
+            names: Names for the new accounts (without the master account suffix)
+            initial_balance: Initial balance of each account in yoctoNEAR
+
+        Returns:
+            The full account IDs, in the order of ``names``
+        """
+        master_account = await self._get_master_account()
+        balance = initial_balance or 10_000_000_000_000_000_000_000_000
+        account_ids = [f"{name}.{self.master_account_id}" for name in names]
+        key_pairs = [_generate_key_pair() for _ in names]
+
+        # Fetch the block hash once instead of in every submission
+        await self._block_hash.get(master_account.provider)
+        results = await asyncio.gather(
+            *(
+                self._submit_concurrent(
+                    master_account,
+                    account_id,
+                    [
+                        transactions.create_create_account_action(),
+                        transactions.create_full_access_key_action(public_key),
+                        transactions.create_transfer_action(balance),
+                    ],
+                )
+                for account_id, (public_key, _) in zip(account_ids, key_pairs)
+            ),
+            return_exceptions=True,
         )
 
-        # Initialize and cache the account
-        self._get_or_create_account(account_id, private_key)
+        # Register every account that was created before reporting failures
+        errors = []
+        for account_id, (_, private_key), result in zip(
+            account_ids, key_pairs, results
+        ):
+            if isinstance(result, BaseException):
+                errors.append(result)
+            else:
+                self._keys[account_id] = private_key
+        if errors:
+            raise errors[0]
 
-        return account_id
+        return account_ids
 
-    def create_subaccount(
+    async def create_account(
+        self, name: str, initial_balance: Optional[int] = None
+    ) -> str:
+        """Create a new account as a subaccount of the master account"""
+        return await self.create_subaccount(
+            self.master_account_id,
+            name,
+            initial_balance or 10_000_000_000_000_000_000_000_000,
+        )
+
+    async def create_subaccount(
         self,
         parent_account_id: str,
         subaccount_name: str,
@@ -100,38 +418,37 @@ class NearClient:
         Returns:
             The full account ID of the newly created subaccount
         """
-        # Ensure parent account exists in our cache
-        if parent_account_id not in self._accounts:
+        # Ensure we hold a key for the parent account
+        if parent_account_id not in self._keys:
             raise ValueError(
                 f"Parent account {parent_account_id} not found or not initialized"
             )
 
-        parent_account = self._accounts[parent_account_id]
+        parent_account = await self._get_or_create_account(parent_account_id)
         subaccount_id = f"{subaccount_name}.{parent_account_id}"
 
         # Generate new key pair for subaccount
-        key_pair = SigningKey.generate()
-        public_key = "ed25519:" + base58.b58encode(bytes(key_pair.verify_key)).decode(
-            "utf-8"
-        )
-        expanded_key = key_pair._signing_key
-        private_key = "ed25519:" + base58.b58encode(expanded_key).decode("utf-8")
+        public_key, private_key = _generate_key_pair()
 
         # Use the parent account to create the subaccount
-        self._run_async(
-            parent_account.create_account(
-                subaccount_id,
-                public_key,
-                initial_balance or 1_000_000_000_000_000_000_000_000,  # Default 1 NEAR
-            )
+        await self._submit(
+            parent_account,
+            subaccount_id,
+            [
+                transactions.create_create_account_action(),
+                transactions.create_full_access_key_action(public_key),
+                transactions.create_transfer_action(
+                    initial_balance or 1_000_000_000_000_000_000_000_000  # 1 NEAR
+                ),
+            ],
         )
 
-        # Initialize and cache the subaccount
-        self._get_or_create_account(subaccount_id, private_key)
+        # Cache the subaccount
+        await self._get_or_create_account(subaccount_id, private_key)
 
         return subaccount_id
 
-    def call_function(
+    async def call_function(
         self,
         sender_id: str,
         contract_id: str,
@@ -141,46 +458,590 @@ class NearClient:
         gas: Optional[int] = DEFAULT_ATTACHED_GAS,
     ) -> Union[TransactionResult, str]:
         """Call a contract function"""
-        sender = self._get_or_create_account(sender_id)
+        sender = await self._get_or_create_account(sender_id)
+        if gas is None:
+            gas = DEFAULT_ATTACHED_GAS
+        action = transactions.create_function_call_action(
+            method_name, json.dumps(args or {}).encode("utf8"), gas, amount
+        )
+        return await self._submit(sender, contract_id, [action])
+
+    async def call_functions(
+        self,
+        sender_id: str,
+        calls: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+        amount: int = 0,
+        gas: Optional[int] = DEFAULT_ATTACHED_GAS,
+    ) -> List[TransactionResult]:
+        """
+        Pipeline many contract calls from one account
+
+        All transactions are signed with consecutive nonces and broadcast
+        back-to-back without waiting for each other; their outcomes are then
+        awaited together. Calls execute in order of their nonces.
+
+        Args:
+            sender_id: The account signing every call
+            calls: (contract_id, method_name, args) of each call
+            amount: Deposit attached to each call in yoctoNEAR
+            gas: Gas attached to each call
+
+        Returns:
+            The transaction results, in the order of ``calls``
+        """
+        sender = await self._get_or_create_account(sender_id)
         if gas is None:
             gas = DEFAULT_ATTACHED_GAS
-        result = self._run_async(
-            sender.function_call(
-                contract_id=contract_id,
-                method_name=method_name,
-                args=args or {},
-                amount=amount,
-                gas=gas,
+
+        # Broadcast in nonce order, so no transaction overtakes an earlier one
+        trx_hashes = []
+        for contract_id, method_name, args in calls:
+            action = transactions.create_function_call_action(
+                method_name, json.dumps(args or {}).encode("utf8"), gas, amount
             )
+            trx_hashes.append(await self._broadcast(sender, contract_id, [action]))
+
+        return list(
+            await asyncio.gather(
+                *(self._wait_for_outcome(sender, trx_hash) for trx_hash in trx_hashes)
+            )
+        )
+
+    async def view_function(
+        self, contract_id: str, method_name: str, args: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Call a view function, reusing a cached result if views are cached"""
+        master_account = await self._get_master_account()
+        if self._view_cache is None:
+            result = await master_account.view_function(
+                contract_id, method_name, args or {}
+            )
+            return result.result
+
+        await self._view_cache.refresh(master_account.provider)
+        key = ViewCache.key(contract_id, method_name, args)
+        cached, value = self._view_cache.get(key)
+        if cached:
+            return value
+
+        generation = self._view_cache.generation
+        result = await master_account.view_function(
+            contract_id, method_name, args or {}
         )
+        self._view_cache.put(key, result.result, generation)
+        return result.result
+
+    async def deploy_contract(
+        self,
+        account_id: str,
+        wasm_file: Union[str, bytes, Path],
+        reuse_code: bool = False,
+    ) -> Any:
+        """
+        Deploy a contract to an account
+
+        With ``reuse_code``, code that this client already deployed once is
+        not uploaded in a transaction again: it is skipped if the account
+        already holds it, and otherwise written with sandbox_patch_state.
+
+        Args:
+            account_id: The account to deploy to
+            wasm_file: Path to the WASM file or WASM binary data
+            reuse_code: Whether to reuse previously deployed code (sandbox only)
+
+        Returns:
+            The transaction result, or None if no transaction was needed
+        """
+        wasm_binary = _read_wasm(wasm_file)
+        code_hash = state.code_hash(wasm_binary)
+
+        if reuse_code and code_hash in self._code_registry:
+            account_info = await self.view_account(account_id)
+            if account_info["code_hash"] == code_hash:
+                logger.debug(f"{account_id} already holds code {code_hash}")
+            else:
+                logger.debug(
+                    f"Installing code {code_hash} from "
+                    f"{self._code_registry[code_hash]} on {account_id} by patching state"
+                )
+                await self._patch_contract(account_id, account_info, wasm_binary, {})
+            return None
+
+        account = await self._get_or_create_account(account_id)
+        result = await self._submit(
+            account,
+            account_id,
+            [transactions.create_deploy_contract_action(wasm_binary)],
+        )
+        self._code_registry.setdefault(code_hash, account_id)
         return result
 
+    async def view_account(self, account_id: str) -> Any:
+        """Get account information"""
+        master_account = await self._get_master_account()
+        return await master_account._provider.get_account(account_id)
+
+    async def view_functions(
+        self, calls: List[Tuple[str, str, Optional[Dict[str, Any]]]]
+    ) -> List[Any]:
+        """Call many view functions concurrently
+
+        Args:
+            calls: (contract_id, method_name, args) of each view
+
+        Returns:
+            The view results, in the order of ``calls``
+        """
+        return await self._gather_reads([("view_function", call) for call in calls])
+
+    async def view_accounts(self, account_ids: List[str]) -> List[Any]:
+        """Get information on many accounts concurrently, in the order given"""
+        return await self._gather_reads(
+            [("view_account", (account_id,)) for account_id in account_ids]
+        )
+
+    async def _gather_reads(self, requests: List[Tuple[str, tuple]]) -> List[Any]:
+        """Send views and account queries concurrently, returning results in order
+
+        NEAR's RPC doesn't accept JSON-RPC batch arrays, so the requests are
+        sent side by side over the client's pooled connections instead.
+        """
+        if self._view_cache is not None:
+            # Check the chain height once for the whole batch
+            master_account = await self._get_master_account()
+            await self._view_cache.refresh(master_account.provider)
+        return list(
+            await asyncio.gather(
+                *(getattr(self, name)(*args) for name, args in requests)
+            )
+        )
+
+    def _invalidate_views(self):
+        """Drop cached view results, before this client changes state"""
+        if self._view_cache is not None:
+            self._view_cache.invalidate()
+
+    def reset_chain_cache(self):
+        """Forget cached block hashes, nonces and views, e.g. after the chain was rolled back"""
+        self._invalidate_views()
+        self._block_hash.invalidate()
+        self._nonces.reset()
+        for account in self._accounts.values():
+            account._latest_block_hash_ts = 0
+
+    # State patching (sandbox only)
+
+    async def patch_state(self, records: List[Dict[str, Any]]) -> bool:
+        """Write state records directly through sandbox_patch_state"""
+        self._invalidate_views()
+        master_account = await self._get_master_account()
+        try:
+            result = await master_account.provider.json_rpc(
+                "sandbox_patch_state", {"records": records}
+            )
+        finally:
+            self._invalidate_views()
+        return result == {}
+
+    async def inject_accounts(
+        self, names: List[str], initial_balance: Optional[int] = None
+    ) -> List[str]:
+        """
+        Create subaccounts of the master account by patching state
+
+        No transactions are sent: the Account and AccessKey records of all
+        accounts are written with a single sandbox_patch_state call. The
+        master account's balance is not charged.
+
+        Args:
+            names: Names for the new accounts (without the master account suffix)
+            initial_balance: Initial balance of each account in yoctoNEAR
+
+        Returns:
+            The full account IDs, in the order of ``names``
+        """
+        balance = initial_balance or 10_000_000_000_000_000_000_000_000
+        account_ids = [f"{name}.{self.master_account_id}" for name in names]
+        key_pairs = [_generate_key_pair() for _ in names]
+
+        records = []
+        for account_id, (public_key, _) in zip(account_ids, key_pairs):
+            records.append(
+                state.account_record(
+                    account_id,
+                    balance,
+                    storage_usage=state.STORAGE_NUM_BYTES_ACCOUNT
+                    + state.access_key_storage_usage(),
+                )
+            )
+            records.append(state.access_key_record(account_id, public_key))
+        await self.patch_state(records)
+
+        for account_id, (_, private_key) in zip(account_ids, key_pairs):
+            self._keys[account_id] = private_key
+        return account_ids
+
+    async def inject_contract(
+        self,
+        account_id: str,
+        wasm_file: Union[str, bytes, Path],
+        data: Optional[Dict[Union[str, bytes], Union[str, bytes]]] = None,
+    ) -> bool:
+        """
+        Install contract code and storage on an existing account by patching state
+
+        Args:
+            account_id: The account to install the contract on
+            wasm_file: Path to the WASM file or WASM binary data
+            data: Raw contract storage entries to write, keyed by storage key
+
+        Returns:
+            True if the state was patched successfully
+        """
+        code = _read_wasm(wasm_file)
+        account = await self.view_account(account_id)
+        return await self._patch_contract(account_id, account, code, data or {})
+
+    async def _patch_contract(
+        self,
+        account_id: str,
+        account: Dict[str, Any],
+        code: bytes,
+        data: Dict[Union[str, bytes], Union[str, bytes]],
+    ) -> bool:
+        """Write contract code and storage on an account with known state"""
+        # Replace any existing code in the storage accounting
+        storage_usage = account["storage_usage"]
+        if account["code_hash"] != state.EMPTY_CODE_HASH:
+            master_account = await self._get_master_account()
+            old_code = await master_account.provider.query(
+                {
+                    "request_type": "view_code",
+                    "account_id": account_id,
+                    "finality": "optimistic",
+                }
+            )
+            storage_usage -= len(base64.b64decode(old_code["code_base64"]))
+        storage_usage += len(code)
+        storage_usage += sum(
+            state.data_storage_usage(key, value) for key, value in data.items()
+        )
+
+        records = [
+            state.account_record(
+                account_id,
+                int(account["amount"]),
+                int(account["locked"]),
+                state.code_hash(code),
+                storage_usage,
+            ),
+            state.contract_record(account_id, code),
+        ]
+        records.extend(
+            state.data_record(account_id, key, value) for key, value in data.items()
+        )
+        return await self.patch_state(records)
+
+
+class NearClient:
+    """A simplified client that manages both sandbox and account operations"""
+
+    def __init__(
+        self,
+        rpc_endpoint: str,
+        master_account_id: str,
+        master_key: str,
+        cache_chain_metadata: Optional[bool] = None,
+        cache_views: Optional[bool] = None,
+    ):
+        """
+        Initialize the client
+
+        Args:
+            rpc_endpoint: RPC URL of the node
+            master_account_id: Account that creates the test accounts
+            master_key: Private key of the master account
+            cache_chain_metadata: Sign every transaction with a locally tracked
+                nonce and a block hash cached for a short TTL, instead of
+                py-near's per-account bookkeeping. Defaults to the
+                NEAR_PYTEST_CACHE_CHAIN_METADATA environment variable.
+            cache_views: Reuse view function results until this client changes
+                state or the chain height advances. Defaults to the
+                NEAR_PYTEST_CACHE_VIEWS environment variable.
+        """
+        self.rpc_endpoint = rpc_endpoint
+        self.master_account_id = master_account_id
+        self.master_key = master_key
+        if cache_chain_metadata is None:
+            cache_chain_metadata = os.environ.get(
+                CACHE_CHAIN_METADATA_ENV, ""
+            ).lower() in ("1", "true", "yes")
+        self.cache_chain_metadata = cache_chain_metadata
+        if cache_views is None:
+            value = os.environ.get(CACHE_VIEWS_ENV, "")
+            cache_views = value.lower() in ("1", "true", "yes")
+        self.cache_views = cache_views
+
+        # Initialize the event loop once
+        self._loop = asyncio.new_event_loop()
+
+        # All operations run through an async client bound to our own loop
+        self._async_client = AsyncNearClient(
+            rpc_endpoint,
+            master_account_id,
+            master_key,
+            cache_chain_metadata=cache_chain_metadata,
+            view_cache=ViewCache() if cache_views else None,
+        )
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+        # Initialize master account
+        self._master_account = self._get_or_create_account(
+            master_account_id, master_key
+        )
+
+    def close(self):
+        """Close the RPC connections and the event loop
+
+        Async clients handed out for other event loops are closed too, unless
+        their loop is running; close those from within it instead.
+        """
+        if self._loop.is_closed():
+            return
+        for loop, async_client in list(self._async_clients.items()):
+            if not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(async_client.close())
+        self._async_clients.clear()
+        self._run_async(self._async_client.close())
+        self._loop.close()
+
+    def __enter__(self) -> "NearClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        """Clean up resources"""
+        if hasattr(self, "_loop") and self._loop and not self._loop.is_closed():
+            self._loop.close()
+
+    def _run_async(self, coro) -> Any:
+        """Simplified method to run async code synchronously"""
+        return self._loop.run_until_complete(coro)
+
+    @property
+    def _accounts(self) -> Dict[str, PyNearAccount]:
+        """Cache of py-near accounts"""
+        return self._async_client._accounts
+
+    @property
+    def async_client(self) -> AsyncNearClient:
+        """Get an async client for the running event loop
+
+        The returned client shares this client's account keys, so accounts
+        created through either can sign through both. Must be accessed from
+        within a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            self._async_clients[loop] = AsyncNearClient(
+                self.rpc_endpoint,
+                self.master_account_id,
+                self.master_key,
+                keys=self._async_client._keys,
+                code_registry=self._async_client._code_registry,
+                nonces=self._async_client._nonces._nonces,
+                cache_chain_metadata=self.cache_chain_metadata,
+                view_cache=self._async_client._view_cache,
+            )
+        return self._async_clients[loop]
+
+    def _get_or_create_account(
+        self, account_id: str, private_key: Optional[str] = None
+    ) -> PyNearAccount:
+        """Get or create a py-near Account"""
+        return self._run_async(
+            self._async_client._get_or_create_account(account_id, private_key)
+        )
+
+    # Core operations
+
+    def create_accounts(
+        self, names: List[str], initial_balance: Optional[int] = None
+    ) -> List[str]:
+        """Create many subaccounts of the master account concurrently"""
+        return self._run_async(
+            self._async_client.create_accounts(names, initial_balance)
+        )
+
+    def create_account(self, name: str, initial_balance: Optional[int] = None) -> str:
+        """Create a new account as a subaccount of the master account"""
+        return self._run_async(self._async_client.create_account(name, initial_balance))
+
+    def create_subaccount(
+        self,
+        parent_account_id: str,
+        subaccount_name: str,
+        initial_balance: Optional[int] = None,
+    ) -> str:
+        """
+        Create a subaccount under a specified parent account
+
+        Args:
+            parent_account_id: The account ID of the parent account
+            subaccount_name: The name for the new subaccount (without the parent prefix)
+            initial_balance: Initial balance in yoctoNEAR (10^-24 NEAR)
+
+        Returns:
+            The full account ID of the newly created subaccount
+        """
+        return self._run_async(
+            self._async_client.create_subaccount(
+                parent_account_id, subaccount_name, initial_balance
+            )
+        )
+
+    def call_function(
+        self,
+        sender_id: str,
+        contract_id: str,
+        method_name: str,
+        args: Optional[Dict[str, Any]] = None,
+        amount: int = 0,
+        gas: Optional[int] = DEFAULT_ATTACHED_GAS,
+    ) -> Union[TransactionResult, str]:
+        """Call a contract function"""
+        return self._run_async(
+            self._async_client.call_function(
+                sender_id, contract_id, method_name, args, amount, gas
+            )
+        )
+
+    def call_functions(
+        self,
+        sender_id: str,
+        calls: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+        amount: int = 0,
+        gas: Optional[int] = DEFAULT_ATTACHED_GAS,
+    ) -> List[TransactionResult]:
+        """Pipeline many contract calls from one account"""
+        return self._run_async(
+            self._async_client.call_functions(sender_id, calls, amount, gas)
+        )
+
     def view_function(
         self, contract_id: str, method_name: str, args: Optional[Dict[str, Any]] = None
     ) -> Any:
         """Call a view function"""
-        result = self._run_async(
-            self._master_account.view_function(contract_id, method_name, args or {})
+        return self._run_async(
+            self._async_client.view_function(contract_id, method_name, args)
         )
-        return result.result
 
     def deploy_contract(
-        self, account_id: str, wasm_file: Union[str, bytes, Path]
+        self,
+        account_id: str,
+        wasm_file: Union[str, bytes, Path],
+        reuse_code: bool = False,
     ) -> Any:
         """Deploy a contract to an account"""
-        account = self._get_or_create_account(account_id)
-
-        # Read wasm file if path is provided
-        if isinstance(wasm_file, (str, Path)):
-            with open(wasm_file, "rb") as f:
-                wasm_binary = f.read()
-        else:
-            wasm_binary = wasm_file
-
-        result = self._run_async(account.deploy_contract(wasm_binary))
-        return result
+        return self._run_async(
+            self._async_client.deploy_contract(account_id, wasm_file, reuse_code)
+        )
 
     def view_account(self, account_id: str) -> Any:
         """Get account information"""
-        result = self._run_async(self._master_account._provider.get_account(account_id))
-        return result
+        return self._run_async(self._async_client.view_account(account_id))
+
+    def view_functions(
+        self, calls: List[Tuple[str, str, Optional[Dict[str, Any]]]]
+    ) -> List[Any]:
+        """Call many view functions concurrently, returning results in order"""
+        return self._run_async(self._async_client.view_functions(calls))
+
+    def view_accounts(self, account_ids: List[str]) -> List[Any]:
+        """Get information on many accounts concurrently, in the order given"""
+        return self._run_async(self._async_client.view_accounts(account_ids))
+
+    def batch(self) -> "RequestBatch":
+        """Collect views and account queries to send them concurrently
+
+        Example::
+
+            with client.batch() as batch:
+                batch.view_function("counter.test.near", "get_count")
+                batch.view_account("alice.test.near")
+            count, alice = batch.results
+        """
+        return RequestBatch(self)
+
+    def reset_chain_cache(self):
+        """Forget cached block hashes and nonces, e.g. after the chain was rolled back"""
+        self._async_client.reset_chain_cache()
+        for async_client in self._async_clients.values():
+            async_client.reset_chain_cache()
+
+    # State patching (sandbox only)
+
+    def patch_state(self, records: List[Dict[str, Any]]) -> bool:
+        """Write state records directly through sandbox_patch_state"""
+        return self._run_async(self._async_client.patch_state(records))
+
+    def inject_accounts(
+        self, names: List[str], initial_balance: Optional[int] = None
+    ) -> List[str]:
+        """Create subaccounts of the master account by patching state"""
+        return self._run_async(
+            self._async_client.inject_accounts(names, initial_balance)
+        )
+
+    def inject_contract(
+        self,
+        account_id: str,
+        wasm_file: Union[str, bytes, Path],
+        data: Optional[Dict[Union[str, bytes], Union[str, bytes]]] = None,
+    ) -> bool:
+        """Install contract code and storage on an existing account by patching state"""
+        return self._run_async(
+            self._async_client.inject_contract(account_id, wasm_file, data)
+        )
+
+
+class RequestBatch:
+    """Views and account queries queued on a NearClient and sent together
+
+    The requests are sent concurrently when the ``with`` block exits (or on
+    ``execute()``); their results are then in ``results``, in queue order.
+    """
+
+    def __init__(self, client: NearClient):
+        self._client = client
+        self._requests: List[Tuple[str, tuple]] = []
+        self.results: List[Any] = []
+
+    def view_function(
+        self, contract_id: str, method_name: str, args: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Queue a view function call, returning the index of its result"""
+        self._requests.append(("view_function", (contract_id, method_name, args)))
+        return len(self._requests) - 1
+
+    def view_account(self, account_id: str) -> int:
+        """Queue an account query, returning the index of its result"""
+        self._requests.append(("view_account", (account_id,)))
+        return len(self._requests) - 1
+
+    def execute(self) -> List[Any]:
+        """Send the queued requests, returning their results in order"""
+        requests, self._requests = self._requests, []
+        self.results = self._client._run_async(
+            self._client._async_client._gather_reads(requests)
+        )
+        return self.results
+
+    def __enter__(self) -> "RequestBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
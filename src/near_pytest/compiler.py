@@ -1,9 +1,56 @@
 import os
+import re
+import sys
+import ast
+import json
+import time
 import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 # Import logger
 from .utils import logger
+from .utils.locking import file_lock, remove_lock_file
+from .remote_cache import get_remote_cache
+from .wasm import get_wasm_opt_version, optimize_wasm
+
+# Manifest describing how each cached artifact was built
+MANIFEST_FILENAME = "manifest.json"
+
+# How the sources of a build are identified (see _get_cache_key)
+HASH_MODES = ("source", "imports")
+
+# Environment variable selecting the default hash mode
+HASH_MODE_ENV = "NEAR_PYTEST_HASH_MODE"
+
+# Environment variables bounding the compile cache
+CACHE_MAX_BYTES_ENV = "NEAR_PYTEST_CACHE_MAX_BYTES"
+CACHE_MAX_AGE_DAYS_ENV = "NEAR_PYTEST_CACHE_MAX_AGE_DAYS"
+
+# Minimum seconds between last-access updates of a manifest entry
+ACCESS_UPDATE_INTERVAL = 3600
+
+# Multipliers of the size suffixes accepted by parse_size
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+# Persisted digests of source files, keyed by path and validated by stat
+FILE_HASHES_FILENAME = "file-hashes.json"
+
+# Files modified this recently (in ns) are hashed but not recorded
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+# Distribution name at the start of a requirement, and an extra-only marker
+_REQUIREMENT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*")
+_EXTRA_MARKER = re.compile(r"\bextra\s*==")
+
+# In-process view of the persisted file digests
+_file_hashes: Optional[Dict[str, list]] = None
+_file_hashes_dirty = False
 
 
 class CompilerError(Exception):
@@ -12,9 +59,10 @@ class CompilerError(Exception):
     pass
 
 
-def compile_contract(contract_path, single_file=False):
+def compile_contract(contract_path, single_file=False, hash_mode=None, optimize=False):
     """Compile a NEAR smart contract"""
     contract_path = Path(contract_path).resolve()
+    hash_mode = _get_hash_mode(hash_mode)
 
     # Check if it's already a WASM file
     if contract_path.suffix == ".wasm":
@@ -22,29 +70,114 @@ def compile_contract(contract_path, single_file=False):
         return contract_path
 
     # Create cache directory
-    cache_dir = Path.home() / ".near-pytest" / "cache"
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir = _get_cache_dir()
+
+    # Calculate the content key of the build
+    cache_key, build_info = _get_cache_key(contract_path, single_file, hash_mode)
+    logger.debug(f"Contract cache key: {cache_key}")
+
+    wasm_path = _get_or_create_artifact(
+        cache_dir,
+        contract_path,
+        cache_key,
+        build_info,
+        lambda output_path: _build_contract(contract_path, output_path, single_file),
+    )
+    if not optimize:
+        return wasm_path
+
+    # The optimized module is cached separately, next to the raw build
+    return _get_or_create_artifact(
+        cache_dir,
+        contract_path,
+        _get_optimized_key(cache_key),
+        {**build_info, "optimized": True, "wasm_opt": get_wasm_opt_version()},
+        lambda output_path: _optimize_contract(wasm_path, output_path),
+    )
 
-    # Calculate hash of source
-    contract_hash = _get_contract_hash(contract_path)
-    logger.debug(f"Contract hash: {contract_hash}")
 
+def _get_or_create_artifact(
+    cache_dir: Path,
+    contract_path: Path,
+    cache_key: str,
+    build_info: dict,
+    create: Callable[[Path], None],
+) -> Path:
+    """Get a cached artifact, fetching or creating it if needed"""
     # Check for cached version
-    wasm_filename = f"{contract_path.stem}-{contract_hash}.wasm"
+    wasm_filename = f"{contract_path.stem}-{cache_key}.wasm"
     cached_wasm_path = cache_dir / wasm_filename
 
     if cached_wasm_path.exists():
         logger.success(f"Using cached compiled contract: {cached_wasm_path}")
+        _touch_manifest_entry(cache_dir, cache_key)
         return cached_wasm_path
 
-    # We need to compile
+    # Only one process creates a given artifact, the others wait and reuse it
+    with file_lock(_get_lock_path(cache_dir, wasm_filename)):
+        if cached_wasm_path.exists():
+            logger.success(
+                f"Using contract compiled by another process: {cached_wasm_path}"
+            )
+            return cached_wasm_path
+
+        if not _fetch_remote(cache_key, cached_wasm_path):
+            create(cached_wasm_path)
+            _publish_remote(cache_key, cached_wasm_path)
+
+        now = time.time()
+        _add_manifest_entry(
+            cache_dir,
+            cache_key,
+            {
+                "contract_path": str(contract_path),
+                "wasm": wasm_filename,
+                "size": cached_wasm_path.stat().st_size,
+                "created_at": now,
+                "last_access": now,
+                **build_info,
+            },
+        )
+
+    logger.success(f"Contract compiled to: {cached_wasm_path}")
+    _auto_prune(keep=cached_wasm_path)
+    return cached_wasm_path
+
+
+def _fetch_remote(cache_key: str, wasm_path: Path) -> bool:
+    """Try to download a prebuilt contract from the remote cache"""
+    remote_cache = get_remote_cache()
+    if remote_cache is None:
+        return False
+    try:
+        if remote_cache.fetch(cache_key, wasm_path):
+            logger.success(f"Fetched compiled contract from remote cache: {wasm_path}")
+            return True
+    except Exception as e:
+        logger.warning(f"Failed to fetch {cache_key} from remote cache: {e}")
+    return False
+
+
+def _publish_remote(cache_key: str, wasm_path: Path):
+    """Upload a freshly built contract to the remote cache"""
+    remote_cache = get_remote_cache()
+    if remote_cache is None:
+        return
+    try:
+        remote_cache.publish(cache_key, wasm_path)
+        logger.debug(f"Published {cache_key} to remote cache")
+    except Exception as e:
+        logger.warning(f"Failed to publish {cache_key} to remote cache: {e}")
+
+
+def _build_contract(contract_path: Path, output_path: Path, single_file: bool):
+    """Compile a contract with nearc"""
     logger.info(f"Compiling contract: {contract_path}")
 
     try:
         import nearc
         from nearc.builder import compile_contract as nearc_compile
 
-        output_path = cache_dir / wasm_filename
         assets_dir = Path(nearc.__file__).parent
         venv_path = _get_venv_path()
 
@@ -53,51 +186,734 @@ def compile_contract(contract_path, single_file=False):
         logger.debug(f"Assets directory: {assets_dir}")
         logger.debug(f"Virtual environment path: {venv_path}")
 
-        success = nearc_compile(
-            contract_path=contract_path,
-            output_path=output_path,
-            venv_path=venv_path,
-            assets_dir=assets_dir,
-            rebuild=False,
-            single_file=single_file,
-        )
+        # nearc builds next to the contract, so siblings must not build at once
+        build_lock = _get_lock_path(output_path.parent, f"build-{contract_path.parent}")
+        with file_lock(build_lock), _atomic_output(output_path) as temp_path:
+            success = nearc_compile(
+                contract_path=contract_path,
+                output_path=temp_path,
+                venv_path=venv_path,
+                assets_dir=assets_dir,
+                rebuild=False,
+                single_file=single_file,
+            )
 
-        if not success or not output_path.exists():
-            logger.error(f"Failed to compile contract: {contract_path}")
-            raise CompilerError(f"Failed to compile contract: {contract_path}")
-
-        logger.success(f"Contract compiled to: {output_path}")
-        return output_path
+            if not success or not temp_path.exists() or temp_path.stat().st_size == 0:
+                logger.error(f"Failed to compile contract: {contract_path}")
+                raise CompilerError(f"Failed to compile contract: {contract_path}")
     except Exception as e:
         logger.error(f"Compilation error: {str(e)}")
         raise CompilerError(f"Failed to compile contract: {str(e)}")
 
 
+def _optimize_contract(wasm_path: Path, output_path: Path):
+    """Run the size optimization stage on a compiled contract"""
+    try:
+        with _atomic_output(output_path) as temp_path:
+            optimize_wasm(wasm_path, temp_path)
+    except Exception as e:
+        logger.error(f"Optimization error: {str(e)}")
+        raise CompilerError(f"Failed to optimize contract: {str(e)}")
+
+
+def _get_optimized_key(cache_key: str) -> str:
+    """Get the cache key of the optimized form of a build"""
+    optimizer = f"{cache_key}:optimized:{get_wasm_opt_version()}"
+    return hashlib.sha256(optimizer.encode()).hexdigest()[:16]
+
+
+@contextmanager
+def _atomic_output(output_path: Path) -> Iterator[Path]:
+    """Yield a temporary path that replaces ``output_path`` on success
+
+    Readers therefore never see a partially written WASM file.
+    """
+    fd, temp_name = tempfile.mkstemp(
+        dir=output_path.parent, prefix=f".{output_path.stem}-", suffix=".wasm"
+    )
+    os.close(fd)
+    temp_path = Path(temp_name)
+    try:
+        yield temp_path
+        os.replace(temp_path, output_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def compile_contracts(
+    contract_paths: Sequence[Union[str, Path]],
+    single_file: bool = False,
+    max_workers: Optional[int] = None,
+    hash_mode: Optional[str] = None,
+    optimize: bool = False,
+) -> List[Path]:
+    """Compile many NEAR smart contracts concurrently
+
+    Contracts missing from the cache are compiled in a process pool.
+    nearc builds in a ``build`` directory next to the contract, so
+    contracts sharing a parent directory are compiled one after another.
+
+    Args:
+        contract_paths: Paths to the contract sources
+        single_file: Whether the contracts are single files
+        max_workers: Maximum number of compiler processes
+        hash_mode: "source" or "imports" (see ``compile_contract``)
+        optimize: Whether to run the size optimization stage
+
+    Returns:
+        Paths to the compiled WASM files, in the order of ``contract_paths``
+    """
+    paths = [Path(path).resolve() for path in contract_paths]
+    hash_mode = _get_hash_mode(hash_mode)
+    results: List[Optional[Path]] = [None] * len(paths)
+
+    # Group contracts that still need compiling by build directory
+    groups: Dict[Path, List[int]] = {}
+    for index, path in enumerate(paths):
+        cached_path = _get_cached_wasm_path(path, single_file, hash_mode, optimize)
+        if cached_path is not None:
+            logger.success(f"Using cached compiled contract: {cached_path}")
+            results[index] = cached_path
+        else:
+            groups.setdefault(path.parent, []).append(index)
+
+    if groups:
+        logger.info(f"Compiling {sum(map(len, groups.values()))} contracts...")
+        errors = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (
+                    indices,
+                    executor.submit(
+                        _compile_sequentially,
+                        [paths[i] for i in indices],
+                        single_file,
+                        hash_mode,
+                        optimize,
+                    ),
+                )
+                for indices in groups.values()
+            ]
+            for indices, future in futures:
+                try:
+                    for index, wasm_path in zip(indices, future.result()):
+                        results[index] = wasm_path
+                except Exception as e:
+                    errors.append(str(e))
+
+        if errors:
+            raise CompilerError("Failed to compile contracts:\n" + "\n".join(errors))
+
+    return [path for path in results if path is not None]
+
+
+def find_stale_cache_entries() -> List[dict]:
+    """Find cached builds whose contract has changed or no longer exists
+
+    Returns:
+        Manifest entries (with their ``key``) that no longer match their source
+    """
+    stale = []
+    manifest = _load_manifest(_get_cache_dir())
+    for cache_key, entry in manifest["entries"].items():
+        contract_path = Path(entry["contract_path"])
+        if not contract_path.exists():
+            stale.append({"key": cache_key, **entry})
+            continue
+        current_key, _ = _get_cache_key(
+            contract_path, entry["single_file"], entry.get("hash_mode", "source")
+        )
+        if entry.get("optimized"):
+            current_key = _get_optimized_key(current_key)
+        if current_key != cache_key:
+            stale.append({"key": cache_key, **entry})
+    return stale
+
+
+def prune_cache(
+    max_bytes: Optional[int] = None,
+    max_age: Optional[float] = None,
+    stale: bool = False,
+    dry_run: bool = False,
+    keep: Optional[Path] = None,
+) -> List[Path]:
+    """Evict compiled contracts from the cache
+
+    Artifacts not used for longer than ``max_age`` are removed first, then the
+    least recently used ones until the cache fits in ``max_bytes``. Artifacts
+    compiled before the manifest existed are aged by their modification time.
+    Lock files no process holds and recorded digests of deleted source files
+    are always removed; the remaining bookkeeping counts toward ``max_bytes``.
+
+    Args:
+        max_bytes: Maximum total size of the cache
+        max_age: Maximum time in seconds since an artifact was last used
+        stale: Also remove builds whose sources changed or no longer exist
+        dry_run: Only report what would be removed
+        keep: An artifact that must not be removed
+
+    Returns:
+        Paths of the removed (or, in a dry run, removable) WASM files
+    """
+    cache_dir = _get_cache_dir()
+    stale_keys = (
+        {entry["key"] for entry in find_stale_cache_entries()} if stale else set()
+    )
+
+    with file_lock(_get_lock_path(cache_dir, MANIFEST_FILENAME)):
+        manifest = _load_manifest(cache_dir)
+        entries_by_wasm = {
+            entry["wasm"]: cache_key for cache_key, entry in manifest["entries"].items()
+        }
+
+        # (last access, size, path, manifest key) of every cached artifact
+        artifacts = []
+        for wasm_path in cache_dir.glob("*.wasm"):
+            if wasm_path.name.startswith("."):
+                continue  # Build in progress
+            stat = wasm_path.stat()
+            cache_key = entries_by_wasm.pop(wasm_path.name, None)
+            last_access = stat.st_mtime
+            if cache_key is not None:
+                entry = manifest["entries"][cache_key]
+                last_access = entry.get("last_access", entry["created_at"])
+            artifacts.append((last_access, stat.st_size, wasm_path, cache_key))
+        artifacts.sort(key=lambda artifact: artifact[0])
+
+        # Entries left over refer to artifacts that were deleted by hand
+        for cache_key in entries_by_wasm.values():
+            del manifest["entries"][cache_key]
+
+        # Lock files and digests of deleted sources would otherwise pile up
+        removed_locks, locks_size = _prune_lock_files(cache_dir, dry_run)
+        removed_hashes, hashes_size = _prune_file_hashes(cache_dir, dry_run)
+
+        now = time.time()
+        total_size = sum(artifact[1] for artifact in artifacts)
+        total_size += locks_size + hashes_size
+        removed = []
+        for last_access, size, wasm_path, cache_key in artifacts:
+            if wasm_path == keep:
+                continue
+            if (
+                cache_key in stale_keys
+                or (max_age is not None and now - last_access > max_age)
+                or (max_bytes is not None and total_size > max_bytes)
+            ):
+                total_size -= size
+                removed.append(wasm_path)
+                if cache_key is not None:
+                    del manifest["entries"][cache_key]
+
+        if not dry_run:
+            for wasm_path in removed:
+                wasm_path.unlink(missing_ok=True)
+            _save_manifest(cache_dir, manifest)
+
+    logger.info(
+        f"{'Would remove' if dry_run else 'Removed'} {len(removed)} cached contracts, "
+        f"{removed_locks} lock files and {removed_hashes} file digests, "
+        f"{total_size} bytes remain"
+    )
+    return removed
+
+
+def _prune_lock_files(cache_dir: Path, dry_run: bool) -> Tuple[int, int]:
+    """Remove lock files no process holds
+
+    Returns:
+        The number of removed (or, in a dry run, present) lock files and the
+        size of those that remain
+    """
+    lock_paths = list((cache_dir / "locks").glob("*.lock"))
+    if dry_run:
+        return len(lock_paths), 0
+
+    removed = remaining_size = 0
+    for lock_path in lock_paths:
+        if remove_lock_file(lock_path):
+            removed += 1
+        else:
+            try:
+                remaining_size += lock_path.stat().st_size
+            except FileNotFoundError:
+                pass
+    return removed, remaining_size
+
+
+def _prune_file_hashes(cache_dir: Path, dry_run: bool) -> Tuple[int, int]:
+    """Forget the recorded digests of source files that no longer exist
+
+    Returns:
+        The number of forgotten digests and the size of the digest file
+    """
+    hashes_path = cache_dir / FILE_HASHES_FILENAME
+    with file_lock(_get_lock_path(cache_dir, FILE_HASHES_FILENAME)):
+        try:
+            with open(hashes_path, "r") as f:
+                file_hashes = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0, 0
+
+        deleted = [path for path in file_hashes if not Path(path).exists()]
+        if deleted and not dry_run:
+            for path in deleted:
+                del file_hashes[path]
+                if _file_hashes is not None:
+                    _file_hashes.pop(path, None)
+            _write_file_hashes(hashes_path, file_hashes)
+        return len(deleted), hashes_path.stat().st_size
+
+
+def parse_size(size: str) -> int:
+    """Parse a size such as "500M" or "2G" into bytes"""
+    text = size.strip().upper().removesuffix("B").removesuffix("I")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    try:
+        return int(float(text[: len(text) - len(unit)]) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise CompilerError(f"Invalid size: {size!r}")
+
+
+def _auto_prune(keep: Path):
+    """Enforce the cache limits set in the environment"""
+    max_bytes = os.environ.get(CACHE_MAX_BYTES_ENV)
+    max_age_days = os.environ.get(CACHE_MAX_AGE_DAYS_ENV)
+    if max_bytes is None and max_age_days is None:
+        return
+    prune_cache(
+        max_bytes=parse_size(max_bytes) if max_bytes else None,
+        max_age=float(max_age_days) * 86400 if max_age_days else None,
+        keep=keep,
+    )
+
+
+def _compile_sequentially(
+    contract_paths: List[Path], single_file: bool, hash_mode: str, optimize: bool
+) -> List[Path]:
+    """Compile contracts one after another (runs in a worker process)"""
+    return [
+        compile_contract(path, single_file, hash_mode, optimize)
+        for path in contract_paths
+    ]
+
+
+def _get_cache_dir() -> Path:
+    """Get the compiled contract cache directory"""
+    cache_dir = Path.home() / ".near-pytest" / "cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def _get_cached_wasm_path(
+    contract_path: Path, single_file: bool, hash_mode: str, optimize: bool
+) -> Optional[Path]:
+    """Get the cached build of a contract, if there is one"""
+    if contract_path.suffix == ".wasm":
+        return contract_path
+    cache_dir = _get_cache_dir()
+    cache_key, _ = _get_cache_key(contract_path, single_file, hash_mode)
+    if optimize:
+        cache_key = _get_optimized_key(cache_key)
+    cached_wasm_path = cache_dir / f"{contract_path.stem}-{cache_key}.wasm"
+    if not cached_wasm_path.exists():
+        return None
+    _touch_manifest_entry(cache_dir, cache_key)
+    return cached_wasm_path
+
+
+def _get_hash_mode(hash_mode: Optional[str]) -> str:
+    """Validate a hash mode, defaulting to the one set in the environment"""
+    if hash_mode is None:
+        hash_mode = os.environ.get(HASH_MODE_ENV, "source")
+    if hash_mode not in HASH_MODES:
+        raise CompilerError(
+            f"Unknown hash mode {hash_mode!r}, expected one of {', '.join(HASH_MODES)}"
+        )
+    return hash_mode
+
+
+def _get_cache_key(
+    contract_path: Path, single_file: bool, hash_mode: str = "source"
+) -> Tuple[str, dict]:
+    """Calculate the content key of a build and the inputs it covers
+
+    In "source" mode the key covers the contract's own files and every package
+    installed in the virtual environment. In "imports" mode it covers the local
+    modules reachable from the contract's imports and the versions of the
+    distributions it imports, so unrelated changes don't trigger a rebuild.
+    """
+    venv_path = _get_venv_path()
+    if hash_mode == "imports":
+        source_hash, dependencies = _get_import_graph_hash(contract_path, venv_path)
+    else:
+        source_hash = _get_contract_hash(contract_path)
+        dependencies = _get_dependency_fingerprint(venv_path)
+
+    build_info = {
+        "source_hash": source_hash,
+        "nearc_version": _get_nearc_version(),
+        "dependencies": dependencies,
+        "single_file": single_file,
+        "hash_mode": hash_mode,
+    }
+    hasher = hashlib.sha256(json.dumps(build_info, sort_keys=True).encode())
+    return hasher.hexdigest()[:16], build_info
+
+
+def _get_nearc_version() -> str:
+    """Get the installed nearc version"""
+    try:
+        return metadata.version("nearc")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _get_site_packages(venv_path: Path) -> List[str]:
+    """Get the site-packages directories of a virtual environment"""
+    site_packages = [str(path) for path in venv_path.glob("lib/python*/site-packages")]
+    return site_packages or sys.path
+
+
+@lru_cache(maxsize=None)
+def _get_dependency_fingerprint(venv_path: Path) -> str:
+    """Fingerprint the packages installed in a virtual environment"""
+    distributions = metadata.distributions(path=_get_site_packages(venv_path))
+    packages = sorted(
+        {f"{dist.metadata['Name']}=={dist.version}" for dist in distributions}
+    )
+    return hashlib.sha256("\n".join(packages).encode()).hexdigest()[:16]
+
+
+def _normalize_distribution_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+@lru_cache(maxsize=None)
+def _get_installed_requirements(
+    venv_path: Path,
+) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+    """Map installed distributions to their pinned name and their requirements
+
+    Requirements only needed for an extra are left out.
+    """
+    installed: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+    for dist in metadata.distributions(path=_get_site_packages(venv_path)):
+        requires = []
+        for requirement in dist.requires or []:
+            match = _REQUIREMENT_NAME.match(requirement)
+            marker = requirement.partition(";")[2]
+            if match and not _EXTRA_MARKER.search(marker):
+                requires.append(_normalize_distribution_name(match.group(0)))
+        installed.setdefault(
+            _normalize_distribution_name(dist.metadata["Name"]),
+            (f"{dist.metadata['Name']}=={dist.version}", tuple(requires)),
+        )
+    return installed
+
+
+def _with_requirements(packages: Set[str], venv_path: Path) -> Set[str]:
+    """Add the installed distributions that ``packages`` depend on, transitively"""
+    installed = _get_installed_requirements(venv_path)
+    result = set(packages)
+    pending = [
+        _normalize_distribution_name(package.partition("==")[0]) for package in packages
+    ]
+    seen: Set[str] = set()
+    while pending:
+        name = pending.pop()
+        if name in seen or name not in installed:
+            continue
+        seen.add(name)
+        package, requires = installed[name]
+        result.add(package)
+        pending.extend(requires)
+    return result
+
+
+@lru_cache(maxsize=None)
+def _get_top_level_distributions(venv_path: Path) -> Dict[str, Tuple[str, ...]]:
+    """Map importable top-level names to the distributions providing them"""
+    providers: Dict[str, Set[str]] = {}
+    for dist in metadata.distributions(path=_get_site_packages(venv_path)):
+        package = f"{dist.metadata['Name']}=={dist.version}"
+        top_level = dist.read_text("top_level.txt")
+        if top_level:
+            names = set(top_level.split())
+        else:
+            # Derive the names from the installed files listed in RECORD
+            names = set()
+            for file in dist.files or []:
+                parts = file.parts
+                if parts[0] == ".." or parts[0].endswith((".dist-info", ".data")):
+                    continue
+                if len(parts) > 1:
+                    names.add(parts[0])
+                elif parts[0].endswith(".py"):
+                    names.add(parts[0][:-3])
+        for name in names:
+            providers.setdefault(name, set()).add(package)
+    return {name: tuple(sorted(packages)) for name, packages in providers.items()}
+
+
+def _get_import_graph_hash(contract_path: Path, venv_path: Path) -> Tuple[str, str]:
+    """Hash the local modules a contract imports and the distributions it uses"""
+    base_dir = contract_path if contract_path.is_dir() else contract_path.parent
+    local_files, external_names = _scan_imports(contract_path)
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for file_path in sorted(local_files):
+        try:
+            name = file_path.relative_to(base_dir).as_posix()
+        except ValueError:
+            name = str(file_path)
+        hasher.update(name.encode() + b"\0")
+        hasher.update(_get_file_digest(file_path).encode())
+    _save_file_hashes()
+
+    # Names no installed distribution provides (e.g. the host "near" module)
+    # are recorded as-is so the key stays stable. The distributions imported
+    # ones depend on count too, since their code is compiled in as well.
+    providers = _get_top_level_distributions(venv_path)
+    imported = {
+        package
+        for name in external_names
+        for package in providers.get(name, (f"{name}==unknown",))
+    }
+    packages = sorted(_with_requirements(imported, venv_path))
+    dependencies = hashlib.sha256("\n".join(packages).encode()).hexdigest()[:16]
+    return hasher.hexdigest()[:16], dependencies
+
+
+def _scan_imports(contract_path: Path) -> Tuple[Set[Path], Set[str]]:
+    """Follow a contract's imports, collecting local files and external names"""
+    base_dir = contract_path if contract_path.is_dir() else contract_path.parent
+
+    # Absolute imports resolve from the contract directory, or from above the
+    # outermost package containing it
+    search_roots = [base_dir]
+    package_root = base_dir
+    while (package_root / "__init__.py").is_file():
+        package_root = package_root.parent
+    if package_root != base_dir:
+        search_roots.append(package_root)
+
+    if contract_path.is_dir():
+        pending = sorted(contract_path.rglob("*.py"))
+    else:
+        pending = [contract_path]
+
+    local_files: Set[Path] = set()
+    external_names: Set[str] = set()
+    while pending:
+        file_path = pending.pop()
+        if file_path in local_files:
+            continue
+        local_files.add(file_path)
+
+        for parts, roots, optional in _iter_imports(file_path, search_roots):
+            for root in roots:
+                module_files = _find_local_module(parts, root)
+                if module_files is not None:
+                    pending.extend(module_files)
+                    break
+            else:
+                # Unresolved absolute imports come from installed distributions
+                if (
+                    not optional
+                    and roots is search_roots
+                    and parts[0] not in sys.stdlib_module_names
+                ):
+                    external_names.add(parts[0])
+    return local_files, external_names
+
+
+def _iter_imports(
+    file_path: Path, search_roots: List[Path]
+) -> Iterator[Tuple[List[str], List[Path], bool]]:
+    """Yield (module parts, roots to resolve from, optional) for each import"""
+    try:
+        tree = ast.parse(file_path.read_bytes(), filename=str(file_path))
+    except SyntaxError:
+        return
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split("."), search_roots, False
+        elif isinstance(node, ast.ImportFrom):
+            parts = node.module.split(".") if node.module else []
+            roots = search_roots
+            if node.level:
+                package_dir = file_path.parent
+                for _ in range(node.level - 1):
+                    package_dir = package_dir.parent
+                roots = [package_dir]
+            if parts:
+                yield parts, roots, False
+            # "from package import name" may import a submodule
+            for alias in node.names:
+                if alias.name != "*":
+                    yield parts + [alias.name], roots, True
+
+
+def _find_local_module(parts: List[str], root: Path) -> Optional[List[Path]]:
+    """Find the files executed when importing a module from ``root``
+
+    Directories without an ``__init__.py`` resolve as namespace packages
+    (PEP 420), which execute no file of their own.
+    """
+    files = []
+    path = root
+    for index, part in enumerate(parts):
+        path = path / part
+        if (path / "__init__.py").is_file():
+            files.append(path / "__init__.py")
+        elif index == len(parts) - 1 and path.with_suffix(".py").is_file():
+            files.append(path.with_suffix(".py"))
+        elif not path.is_dir():
+            return None
+    return files
+
+
+def _load_manifest(cache_dir: Path) -> dict:
+    """Load the cache manifest"""
+    try:
+        with open(cache_dir / MANIFEST_FILENAME, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"entries": {}}
+
+
+def _save_manifest(cache_dir: Path, manifest: dict):
+    """Atomically replace the cache manifest"""
+    manifest_path = cache_dir / MANIFEST_FILENAME
+    temp_path = manifest_path.with_name(f".{MANIFEST_FILENAME}.{os.getpid()}")
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+
+def _add_manifest_entry(cache_dir: Path, cache_key: str, entry: dict):
+    """Record a cached build in the manifest"""
+    with file_lock(_get_lock_path(cache_dir, MANIFEST_FILENAME)):
+        manifest = _load_manifest(cache_dir)
+        manifest["entries"][cache_key] = entry
+        _save_manifest(cache_dir, manifest)
+
+
+def _touch_manifest_entry(cache_dir: Path, cache_key: str):
+    """Record a cache hit, at most once per ACCESS_UPDATE_INTERVAL"""
+    entry = _load_manifest(cache_dir)["entries"].get(cache_key)
+    if (
+        entry is None
+        or time.time() - entry.get("last_access", 0) < ACCESS_UPDATE_INTERVAL
+    ):
+        return
+    with file_lock(_get_lock_path(cache_dir, MANIFEST_FILENAME)):
+        manifest = _load_manifest(cache_dir)
+        if cache_key in manifest["entries"]:
+            manifest["entries"][cache_key]["last_access"] = time.time()
+            _save_manifest(cache_dir, manifest)
+
+
+def _get_lock_path(cache_dir: Path, name: str) -> Path:
+    """Get the lock file guarding a named resource of the cache"""
+    digest = hashlib.sha256(name.encode()).hexdigest()[:16]
+    return cache_dir / "locks" / f"{digest}.lock"
+
+
 def _get_contract_hash(contract_path):
     """Calculate hash of contract source"""
-    # If it's a directory, hash all Python files
+    # If it's a directory, hash all Python files in a stable order
     if contract_path.is_dir():
         logger.debug(f"Calculating hash for directory: {contract_path}")
-        hasher = hashlib.sha256()
-        for root, _, files in os.walk(contract_path):
-            for file in files:
+        hasher = hashlib.blake2b(digest_size=16)
+        for root, dirs, files in os.walk(contract_path):
+            dirs.sort()
+            for file in sorted(files):
                 if file.endswith(".py"):
                     file_path = Path(root) / file
                     logger.debug(f"Including file in hash: {file_path}")
-                    with open(file_path, "rb") as f:
-                        hasher.update(f.read())
-        return hasher.hexdigest()[:16]
+                    relative_path = file_path.relative_to(contract_path).as_posix()
+                    hasher.update(relative_path.encode() + b"\0")
+                    hasher.update(_get_file_digest(file_path).encode())
+        digest = hasher.hexdigest()
     else:
         # It's a single file
         logger.debug(f"Calculating hash for file: {contract_path}")
-        with open(contract_path, "rb") as f:
-            return hashlib.sha256(f.read()).hexdigest()[:16]
+        digest = _get_file_digest(contract_path)
+
+    _save_file_hashes()
+    return digest[:16]
+
+
+def _get_file_digest(file_path: Path) -> str:
+    """Hash a file, reusing the digest recorded for an unchanged stat"""
+    global _file_hashes_dirty
+
+    file_hashes = _load_file_hashes()
+    stat = file_path.stat()
+    signature = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+    entry = file_hashes.get(str(file_path))
+    if entry is not None and entry[:3] == signature:
+        return entry[3]
+
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(1 << 16):
+            hasher.update(chunk)
+    hexdigest = hasher.hexdigest()
+
+    # An edit within the same mtime tick would go unnoticed, so skip fresh files
+    if time.time_ns() - stat.st_mtime_ns > RACY_MTIME_WINDOW_NS:
+        file_hashes[str(file_path)] = signature + [hexdigest]
+        _file_hashes_dirty = True
+    return hexdigest
+
+
+def _load_file_hashes() -> Dict[str, list]:
+    """Load the persisted file digests (once per process)"""
+    global _file_hashes
+
+    if _file_hashes is None:
+        try:
+            with open(_get_cache_dir() / FILE_HASHES_FILENAME, "r") as f:
+                _file_hashes = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _file_hashes = {}
+    return _file_hashes
+
+
+def _save_file_hashes():
+    """Persist new file digests, merging those written by other processes"""
+    global _file_hashes_dirty
+
+    if not _file_hashes_dirty:
+        return
+    cache_dir = _get_cache_dir()
+    hashes_path = cache_dir / FILE_HASHES_FILENAME
+    with file_lock(_get_lock_path(cache_dir, FILE_HASHES_FILENAME)):
+        try:
+            with open(hashes_path, "r") as f:
+                file_hashes = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            file_hashes = {}
+        file_hashes.update(_load_file_hashes())
+        _write_file_hashes(hashes_path, file_hashes)
+    _file_hashes_dirty = False
+
+
+def _write_file_hashes(hashes_path: Path, file_hashes: Dict[str, list]):
+    """Atomically replace the persisted file digests"""
+    temp_path = hashes_path.with_name(f".{FILE_HASHES_FILENAME}.{os.getpid()}")
+    with open(temp_path, "w") as f:
+        json.dump(file_hashes, f)
+    os.replace(temp_path, hashes_path)
 
 
 def _get_venv_path():
     """Get virtual environment path"""
-    import sys
-
     # Try to detect the virtual environment
     if hasattr(sys, "real_prefix") or (
         hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix
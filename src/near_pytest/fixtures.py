@@ -27,6 +27,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Union, List, TypeVar, Generator
 
 from .sandbox import SandboxManager
+from .pool import SandboxPool
 from .client import NearClient
 from .models import (
     Account,
@@ -35,6 +36,8 @@ from .models import (
     ContractResponse,
 )
 from .compiler import compile_contract as compiler_func
+from .compiler import compile_contracts as compiler_many_func
+from .state import RecordKey, StateSnapshot
 from .utils import logger
 
 # Type definitions
@@ -86,6 +89,28 @@ class ContractCall:
                 f"Failed to call {self.method_name}: {str(e)}", None
             ) from e
 
+    async def as_transaction_async(
+        self, account: Account, amount: int = 0, gas: Optional[int] = None
+    ) -> ContractResponse:
+        """Execute the call as a transaction from within a running event loop."""
+        try:
+            result = await self.contract.call_as_async(
+                account,
+                self.method_name,
+                self.args,
+                amount,
+                gas,
+                return_full_result=False,
+            )
+            if isinstance(result, tuple):
+                return result[0]
+            return result
+        except Exception as e:
+            logger.error(f"Transaction failed: {self.method_name}({self.args})")
+            raise ContractCallError(
+                f"Failed to call {self.method_name}: {str(e)}", None
+            ) from e
+
     def as_view(self) -> ContractResponse:
         """Execute the call as a view method."""
         try:
@@ -97,6 +122,16 @@ class ContractCall:
                 f"Failed to view {self.method_name}: {str(e)}", None
             ) from e
 
+    async def as_view_async(self) -> ContractResponse:
+        """Execute the call as a view method from within a running event loop."""
+        try:
+            return await self.contract.view_async(self.method_name, self.args)
+        except Exception as e:
+            logger.error(f"View call failed: {self.method_name}({self.args})")
+            raise ContractCallError(
+                f"Failed to view {self.method_name}: {str(e)}", None
+            ) from e
+
 
 class EnhancedContract:
     """
@@ -142,6 +177,11 @@ class SandboxProxy:
         self.master_account_id: str = "test.near"
         self.network = "localnet"  # Identifies this as using the local network
 
+        # Snapshot used for per-test isolation, and the number of shared
+        # fixtures that had been set up when it was taken
+        self._isolation_snapshot: Optional[StateSnapshot] = None
+        self._isolation_setups = 0
+
     def create_account(self, name: str) -> Account:
         """
         Create a new account with the given name.
@@ -157,6 +197,48 @@ class SandboxProxy:
         logger.info(f"Created account: {account_id}")
         return Account(self.client, account_id)
 
+    def create_accounts(
+        self, names: List[str], balance: Optional[int] = None
+    ) -> List[Account]:
+        """
+        Create several accounts at once.
+
+        The creation transactions are submitted concurrently rather than
+        one after another, which is much faster for large fixtures.
+
+        Args:
+            names: Names for the new accounts (each suffixed with .test.near)
+            balance: Optional initial balance of each account in yoctoNEAR
+
+        Returns:
+            Account objects for the new accounts, in the order of ``names``
+        """
+        account_ids = self.client.create_accounts(names, balance)
+        logger.info(f"Created {len(account_ids)} accounts")
+        return [Account(self.client, account_id) for account_id in account_ids]
+
+    def view_accounts(
+        self, accounts: List[Union[Account, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the on-chain information of several accounts at once.
+
+        The queries are sent concurrently rather than one after another.
+
+        Args:
+            accounts: Account objects or account IDs
+
+        Returns:
+            The account information (balance, code hash, storage usage, ...),
+            in the order of ``accounts``
+        """
+        with self.client.batch() as batch:
+            for account in accounts:
+                batch.view_account(
+                    account.account_id if isinstance(account, Account) else account
+                )
+        return batch.results
+
     def create_random_account(self, prefix: str = "test") -> Account:
         """
         Create a new account with a random name.
@@ -178,6 +260,7 @@ class SandboxProxy:
         account: Account,
         init_args: Optional[Dict[str, Any]] = None,
         init_method: str = "new",
+        reuse_code: bool = False,
     ) -> EnhancedContract:
         """
         Deploy a contract to the given account and optionally initialize it.
@@ -187,13 +270,15 @@ class SandboxProxy:
             account: Account object to deploy to
             init_args: Optional arguments for contract initialization
             init_method: Name of the initialization method (default: "new")
+            reuse_code: Install code that was deployed before by patching state
+                instead of uploading it in a transaction
 
         Returns:
             An EnhancedContract object for interacting with the deployed contract
         """
         # Deploy the contract
         logger.info(f"Deploying contract to {account.account_id}...")
-        account.deploy_contract(wasm_path)
+        account.deploy_contract(wasm_path, reuse_code=reuse_code)
 
         # Create the contract wrapper
         contract = Contract(self.client, account.account_id)
@@ -210,6 +295,86 @@ class SandboxProxy:
         logger.success(f"Contract deployed to {account.account_id}")
         return enhanced_contract
 
+    async def deploy_async(
+        self,
+        wasm_path: Union[str, Path],
+        account: Account,
+        init_args: Optional[Dict[str, Any]] = None,
+        init_method: str = "new",
+        reuse_code: bool = False,
+    ) -> EnhancedContract:
+        """
+        Deploy a contract from within a running event loop.
+
+        Accepts the same arguments as :meth:`deploy`, so several deployments
+        can be awaited together with ``asyncio.gather``.
+
+        Returns:
+            An EnhancedContract object for interacting with the deployed contract
+        """
+        logger.info(f"Deploying contract to {account.account_id}...")
+        await self.client.async_client.deploy_contract(
+            account.account_id, wasm_path, reuse_code
+        )
+
+        contract = Contract(self.client, account.account_id)
+        enhanced_contract = EnhancedContract(contract)
+
+        if init_args is not None:
+            logger.info(f"Initializing contract with {init_method}({init_args})...")
+            call = enhanced_contract.call(init_method, **init_args)
+            await call.as_transaction_async(account)
+            logger.success("Contract initialized successfully")
+
+        logger.success(f"Contract deployed to {account.account_id}")
+        return enhanced_contract
+
+    def inject_accounts(
+        self, names: List[str], balance: Optional[int] = None
+    ) -> List[Account]:
+        """
+        Create accounts by writing their records directly into sandbox state.
+
+        Unlike create_accounts(), this sends no transactions, so seeding
+        thousands of accounts takes a single RPC call.
+
+        Args:
+            names: Names for the new accounts (each suffixed with .test.near)
+            balance: Optional initial balance of each account in yoctoNEAR
+
+        Returns:
+            Account objects for the new accounts, in the order of ``names``
+        """
+        account_ids = self.client.inject_accounts(names, balance)
+        logger.info(f"Injected {len(account_ids)} accounts")
+        return [Account(self.client, account_id) for account_id in account_ids]
+
+    def inject_contract(
+        self,
+        wasm_path: Union[str, Path],
+        account: Account,
+        data: Optional[Dict[Union[str, bytes], Union[str, bytes]]] = None,
+    ) -> EnhancedContract:
+        """
+        Install a contract and its storage by writing directly into sandbox state.
+
+        No initialization method is called; use ``data`` to provide the raw
+        storage entries the contract expects.
+
+        Args:
+            wasm_path: Path to the compiled WASM file
+            account: Existing account to install the contract on
+            data: Raw contract storage entries, keyed by storage key
+
+        Returns:
+            An EnhancedContract object for interacting with the contract
+        """
+        logger.info(f"Injecting contract into {account.account_id}...")
+        if not self.client.inject_contract(account.account_id, wasm_path, data):
+            raise RuntimeError(f"Failed to inject contract into {account.account_id}")
+        logger.success(f"Contract injected into {account.account_id}")
+        return EnhancedContract(Contract(self.client, account.account_id))
+
     def save_state(self) -> List[Dict[str, Any]]:
         """
         Save the current sandbox state for later resetting.
@@ -231,18 +396,192 @@ class SandboxProxy:
             True if successful, False otherwise
         """
         logger.info("Restoring sandbox state...")
-        result = self.client._run_async(
-            self.client._master_account.provider.json_rpc(
-                "sandbox_patch_state", {"records": state}
-            )
-        )
-        success = result == {}
+        success = self.client.patch_state(state)
         if success:
             logger.success("Sandbox state restored successfully")
         else:
             logger.error("Failed to restore sandbox state")
         return success
 
+    def save_snapshot(self) -> StateSnapshot:
+        """
+        Save the sandbox state as the records changed since genesis.
+
+        Unlike save_state(), the snapshot keeps only records that differ
+        from genesis, and restoring it patches only what changed since.
+
+        Returns:
+            The snapshot object
+        """
+        logger.info("Saving sandbox snapshot...")
+        return self.sandbox.snapshot_state()
+
+    def restore_snapshot(
+        self, snapshot: StateSnapshot, created: Optional[List[RecordKey]] = None
+    ) -> bool:
+        """
+        Restore the sandbox to a snapshot returned by save_snapshot().
+
+        State patching can't delete entries, so accounts, access keys and
+        contract storage keys created since the snapshot remain; a warning
+        is logged for them. Access key nonces are never rewound.
+
+        Args:
+            snapshot: The snapshot to restore
+            created: If given, the keys of the entries that remain are
+                appended to it
+
+        Returns:
+            True if successful, False otherwise
+        """
+        logger.info("Restoring sandbox snapshot...")
+        if created is None:
+            created = []
+        records = snapshot.restore_records(self.sandbox.iter_state(), created)
+        if created:
+            logger.warning(
+                f"{len(created)} state entries created since the snapshot "
+                f"can't be removed: {_describe_keys(created)}"
+            )
+        if not records:
+            logger.debug("Sandbox state already matches snapshot")
+            return True
+
+        logger.debug(f"Patching {len(records)} changed records")
+        success = self.client.patch_state(records)
+        if success:
+            logger.success("Sandbox snapshot restored successfully")
+        else:
+            logger.error("Failed to restore sandbox snapshot")
+        return success
+
+    def checkpoint(self, name: str) -> None:
+        """
+        Save the sandbox's on-disk state under a name.
+
+        The sandbox restarts while the checkpoint is taken. Restoring it
+        later is fast and does not depend on how large the state is.
+
+        Args:
+            name: Name of the checkpoint
+        """
+        self.sandbox.checkpoint(name)
+
+    def restore_checkpoint(self, name: str) -> None:
+        """
+        Restart the sandbox from a checkpoint saved with checkpoint().
+
+        Args:
+            name: Name of the checkpoint
+        """
+        self.sandbox.restore(name)
+        # Blocks produced after the checkpoint no longer exist
+        self.client.reset_chain_cache()
+
+
+# Per-test state isolation
+
+ISOLATION_MODES = ("none", "snapshot")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addini(
+        "near_isolation",
+        "Per-test NEAR sandbox state isolation for all tests: none or snapshot. "
+        "Entries created by a test (accounts, keys, storage keys) can't be removed",
+        default="none",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "near_isolated: restore the sandbox state changed by this test and its "
+        "function-scoped fixtures after it runs; entries they created (accounts, "
+        "keys, storage keys) remain",
+    )
+    mode = config.getini("near_isolation")
+    if mode not in ISOLATION_MODES:
+        raise pytest.UsageError(
+            f"near_isolation must be one of {', '.join(ISOLATION_MODES)}, got {mode!r}"
+        )
+
+
+def _is_isolated(item: pytest.Item) -> bool:
+    """Check whether a test asked for sandbox state isolation"""
+    if item.get_closest_marker("near_isolated") is not None:
+        return True
+    return item.config.getini("near_isolation") == "snapshot"
+
+
+# Number of non-function-scoped fixtures set up so far
+_shared_fixture_setups = pytest.StashKey[int]()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(
+    fixturedef: pytest.FixtureDef[Any], request: pytest.FixtureRequest
+) -> Generator[None, None, None]:
+    """Count shared fixture setups, which make the isolation snapshot stale"""
+    yield
+    if fixturedef.scope != "function":
+        stash = request.config.stash
+        stash[_shared_fixture_setups] = stash.get(_shared_fixture_setups, 0) + 1
+
+
+def _describe_keys(keys: List[RecordKey], limit: int = 5) -> str:
+    """Format state entry keys for a message"""
+    described = ", ".join("/".join(key) for key in keys[:limit])
+    if len(keys) > limit:
+        described += f" and {len(keys) - limit} more"
+    return described
+
+
+@pytest.fixture(autouse=True)
+def _near_isolation(request: pytest.FixtureRequest) -> Generator[None, None, None]:
+    """
+    Restore the sandbox state around isolated tests.
+
+    As an autouse fixture this is set up before the test's other
+    function-scoped fixtures and torn down after them, so what they change
+    during setup and teardown is restored along with the test's own changes.
+    The snapshot is reused by later isolated tests until a shared
+    (non-function-scoped) fixture is set up or a non-isolated test changes
+    the state.
+    """
+    if "sandbox" not in request.fixturenames:
+        yield
+        return
+    proxy = request.getfixturevalue("sandbox")
+    if not isinstance(proxy, SandboxProxy):
+        yield
+        return
+
+    if not _is_isolated(request.node):
+        # The test may change state the cached snapshot would revert
+        proxy._isolation_snapshot = None
+        yield
+        return
+
+    setups = request.config.stash.get(_shared_fixture_setups, 0)
+    if proxy._isolation_snapshot is None or proxy._isolation_setups != setups:
+        proxy._isolation_snapshot = proxy.save_snapshot()
+        proxy._isolation_setups = setups
+
+    yield
+
+    created: List[RecordKey] = []
+    if not proxy.restore_snapshot(proxy._isolation_snapshot, created):
+        proxy._isolation_snapshot = None
+    if created:
+        request.node.warn(
+            pytest.PytestWarning(
+                f"Isolated test or its function-scoped fixtures created "
+                f"{len(created)} state entries that can't be removed and remain "
+                f"for later tests: {_describe_keys(created)}"
+            )
+        )
+
 
 # Main fixtures for pytest
 
@@ -256,8 +595,8 @@ def sandbox() -> Generator[SandboxProxy, None, None]:
     interface for interacting with it throughout the test session.
     """
     logger.info("Starting NEAR sandbox for test session...")
-    sandbox_instance = SandboxManager()
-    sandbox_instance.start()
+    pool = SandboxPool.get_instance()
+    sandbox_instance = pool.acquire()
 
     client = NearClient(
         sandbox_instance.rpc_endpoint(),
@@ -272,7 +611,8 @@ def sandbox() -> Generator[SandboxProxy, None, None]:
 
     # Teardown
     logger.info("Stopping NEAR sandbox...")
-    sandbox_instance.stop()
+    client.close()
+    pool.release(sandbox_instance)
     logger.success("NEAR sandbox stopped")
 
 
@@ -328,7 +668,10 @@ temp_account = localnet_temp_account
 
 # Helper function (not a fixture)
 def compile_contract(
-    contract_path: Union[str, Path], single_file: bool = False
+    contract_path: Union[str, Path],
+    single_file: bool = False,
+    hash_mode: Optional[str] = None,
+    optimize: bool = False,
 ) -> Path:
     """
     Compile a contract and return the WASM path.
@@ -340,11 +683,48 @@ def compile_contract(
     Args:
         contract_path: Path to the contract source
         single_file: Whether the contract is a single file
+        hash_mode: "source" (contract files) or "imports" (import graph)
+        optimize: Whether to shrink the WASM (wasm-opt, custom section stripping)
 
     Returns:
         Path to the compiled WASM file
     """
     logger.info(f"Compiling contract: {contract_path}")
-    wasm_path = compiler_func(contract_path, single_file=single_file)
+    wasm_path = compiler_func(
+        contract_path, single_file=single_file, hash_mode=hash_mode, optimize=optimize
+    )
     logger.success(f"Contract compiled: {wasm_path}")
     return wasm_path
+
+
+# Helper function (not a fixture)
+def compile_contracts(
+    contract_paths: List[Union[str, Path]],
+    single_file: bool = False,
+    max_workers: Optional[int] = None,
+    hash_mode: Optional[str] = None,
+    optimize: bool = False,
+) -> List[Path]:
+    """
+    Compile several contracts in parallel and return their WASM paths.
+
+    Args:
+        contract_paths: Paths to the contract sources
+        single_file: Whether the contracts are single files
+        max_workers: Maximum number of compiler processes
+        hash_mode: "source" (contract files) or "imports" (import graph)
+        optimize: Whether to shrink the WASM (wasm-opt, custom section stripping)
+
+    Returns:
+        Paths to the compiled WASM files, in the same order
+    """
+    logger.info(f"Compiling {len(contract_paths)} contracts")
+    wasm_paths = compiler_many_func(
+        contract_paths,
+        single_file=single_file,
+        max_workers=max_workers,
+        hash_mode=hash_mode,
+        optimize=optimize,
+    )
+    logger.success(f"Contracts compiled: {', '.join(map(str, wasm_paths))}")
+    return wasm_paths
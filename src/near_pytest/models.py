@@ -206,6 +206,31 @@ class Account:
             (response, response.transaction_result) if return_full_result else response
         )
 
+    async def call_contract_async(
+        self,
+        contract_id: str,
+        method_name: str,
+        args: Optional[Dict[str, Any]] = None,
+        amount: int = 0,
+        gas: Optional[int] = DEFAULT_ATTACHED_GAS,
+        return_full_result: bool = False,
+    ) -> Union[ContractResponse, Tuple[ContractResponse, Optional[TransactionResult]]]:
+        """Call a contract method from within a running event loop.
+
+        Accepts the same arguments as :meth:`call_contract`.
+
+        Raises:
+            ContractCallError: If the contract call fails
+        """
+        result = await self.client.async_client.call_function(
+            self.account_id, contract_id, method_name, args, amount, gas
+        )
+
+        response = ContractResponse.from_result(result, log_prefix="Account")
+        return (
+            (response, response.transaction_result) if return_full_result else response
+        )
+
     def view_contract(
         self, contract_id: str, method_name: str, args: Optional[Dict[str, Any]] = None
     ) -> Any:
@@ -221,16 +246,18 @@ class Account:
         """
         return self.client.view_function(contract_id, method_name, args)
 
-    def deploy_contract(self, wasm_file) -> Any:
+    def deploy_contract(self, wasm_file, reuse_code: bool = False) -> Any:
         """Deploy a contract to this account.
 
         Args:
             wasm_file: Path to the WASM file or WASM binary data
+            reuse_code: Install code deployed before by patching state instead
+                of uploading it in a transaction (sandbox only)
 
         Returns:
             The result of the deployment operation
         """
-        return self.client.deploy_contract(self.account_id, wasm_file)
+        return self.client.deploy_contract(self.account_id, wasm_file, reuse_code)
 
 
 class Contract:
@@ -314,6 +341,31 @@ class Contract:
             (response, response.transaction_result) if return_full_result else response
         )
 
+    async def call_as_async(
+        self,
+        account: Account,
+        method_name: str,
+        args: Optional[Dict[str, Any]] = None,
+        amount: int = 0,
+        gas: Optional[int] = DEFAULT_ATTACHED_GAS,
+        return_full_result: bool = False,
+    ) -> Union[ContractResponse, Tuple[ContractResponse, Optional[TransactionResult]]]:
+        """Call the contract as a different account from within a running event loop.
+
+        Accepts the same arguments as :meth:`call_as`.
+
+        Raises:
+            ContractCallError: If the contract call fails
+        """
+        result = await self.client.async_client.call_function(
+            account.account_id, self.account_id, method_name, args, amount, gas
+        )
+
+        response = ContractResponse.from_result(result)
+        return (
+            (response, response.transaction_result) if return_full_result else response
+        )
+
     def view(
         self, method_name: str, args: Optional[Dict[str, Any]] = None
     ) -> ContractResponse:
@@ -328,3 +380,38 @@ class Contract:
         """
         result = self.client.view_function(self.account_id, method_name, args)
         return ContractResponse.from_result(json.dumps(result))
+
+    async def view_async(
+        self, method_name: str, args: Optional[Dict[str, Any]] = None
+    ) -> ContractResponse:
+        """Call a view method on the contract from within a running event loop.
+
+        Args:
+            method_name: The view method to call
+            args: Arguments to pass to the method
+
+        Returns:
+            The result of the view method call
+        """
+        result = await self.client.async_client.view_function(
+            self.account_id, method_name, args
+        )
+        return ContractResponse.from_result(json.dumps(result))
+
+    def view_many(
+        self, calls: List[Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> List[ContractResponse]:
+        """Call several view methods on the contract concurrently.
+
+        Args:
+            calls: (method_name, args) of each view
+
+        Returns:
+            The results of the view method calls, in the order of ``calls``
+        """
+        with self.client.batch() as batch:
+            for method_name, args in calls:
+                batch.view_function(self.account_id, method_name, args)
+        return [
+            ContractResponse.from_result(json.dumps(result)) for result in batch.results
+        ]
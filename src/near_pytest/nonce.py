@@ -0,0 +1,115 @@
+# near_pytest/nonce.py
+"""Local bookkeeping of access key nonces and recent block hashes for signing."""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+import base58
+from py_near.account import Account as PyNearAccount
+from py_near.providers import JsonProvider
+
+# Seconds a fetched block hash is reused for. Transactions may reference any
+# block within the validity period (a day of blocks), so this can be generous.
+BLOCK_HASH_TTL = 10.0
+
+NonceKey = Tuple[str, bytes]
+
+
+class BlockHashCache:
+    """A recent block hash shared by the transactions signed through a client"""
+
+    def __init__(self, ttl: float = BLOCK_HASH_TTL):
+        self.ttl = ttl
+        self._block_hash: Optional[str] = None
+        self._block_height = 0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def height(self) -> int:
+        """Height of the cached block"""
+        return self._block_height
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._block_hash is not None
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    async def get(self, provider: JsonProvider) -> bytes:
+        """Get the cached block hash, fetching a new one once it expired"""
+        if not self._is_fresh():
+            async with self._lock:
+                # Concurrent callers share a single status request
+                if not self._is_fresh():
+                    status = await provider.get_status()
+                    sync_info = status["sync_info"]
+                    self._block_hash = sync_info["latest_block_hash"]
+                    self._block_height = sync_info["latest_block_height"]
+                    self._fetched_at = time.monotonic()
+        assert self._block_hash is not None
+        return base58.b58decode(self._block_hash.encode("utf8"))
+
+    def invalidate(self):
+        """Forget the cached block hash"""
+        self._block_hash = None
+
+
+class NonceManager:
+    """Hands out access key nonces locally, per (account, key)
+
+    The on-chain nonce is fetched once per key; later transactions just take
+    the next number, so many transactions from one signer can be signed and
+    broadcast back-to-back. Nonces are kept in step with py-near's own counter,
+    so transactions signed by py-near's Account methods don't collide.
+
+    The nonce table can be shared between managers (e.g. one per event loop).
+    """
+
+    def __init__(self, nonces: Optional[Dict[NonceKey, int]] = None):
+        self._nonces: Dict[NonceKey, int] = nonces if nonces is not None else {}
+        self._locks: Dict[NonceKey, asyncio.Lock] = {}
+
+    async def sync(self, account: PyNearAccount, pk: bytes):
+        """Fetch the on-chain nonce of an access key once
+
+        Concurrent callers share a single fetch. The result also seeds
+        py-near's own counter, whose first fetch isn't serialized: concurrent
+        first transactions signed by py-near would otherwise reuse one nonce.
+        """
+        key = (account.account_id, pk)
+        if key not in self._nonces:
+            async with self._locks.setdefault(key, asyncio.Lock()):
+                if key not in self._nonces:
+                    await self._fetch(account, pk)
+
+    async def next(self, account: PyNearAccount, pk: bytes) -> int:
+        """Reserve the next nonce of an access key"""
+        await self.sync(account, pk)
+        key = (account.account_id, pk)
+        # Skip nonces py-near's Account methods used in the meantime
+        nonce = max(self._nonces[key], PyNearAccount._access_key_nonce[pk]) + 1
+        self._nonces[key] = PyNearAccount._access_key_nonce[pk] = nonce
+        return nonce
+
+    async def resync(self, account: PyNearAccount, pk: bytes):
+        """Catch up with the chain after a nonce was rejected
+
+        Nonces reserved locally but not yet on chain are never handed out
+        twice: the counter only moves forward.
+        """
+        await self._fetch(account, pk)
+
+    async def _fetch(self, account: PyNearAccount, pk: bytes):
+        access_key = await account.get_access_key(pk)
+        key = (account.account_id, pk)
+        self._nonces[key] = PyNearAccount._access_key_nonce[pk] = max(
+            self._nonces.get(key, 0),
+            access_key.nonce,
+            PyNearAccount._access_key_nonce[pk],
+        )
+
+    def reset(self):
+        """Forget all nonces, e.g. after the chain was rolled back"""
+        self._nonces.clear()
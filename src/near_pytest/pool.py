@@ -0,0 +1,104 @@
+# near_pytest/pool.py
+import os
+import atexit
+import shutil
+from collections import deque
+from typing import Deque, Optional
+
+from .sandbox import SandboxManager
+
+# Import logger
+from .utils import logger
+
+# Environment variable controlling how many sandboxes each process keeps
+POOL_SIZE_ENV = "NEAR_PYTEST_SANDBOX_POOL_SIZE"
+
+
+class SandboxPool:
+    """Keeps started sandboxes warm and leases them to test classes
+
+    The pool owns up to ``size`` sandboxes. Leasing one immediately launches
+    replacements in the background, so their boot overlaps with the tests
+    using the leased sandbox. Released sandboxes are reset to genesis (their
+    initialized home directory is kept) and go back into the pool.
+
+    Each process has its own pool; under pytest-xdist every worker keeps its
+    own warm sandboxes. A size of 0 disables pooling: every lease starts a
+    fresh sandbox and every release stops it.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, size: Optional[int] = None) -> "SandboxPool":
+        """Get or create the per-process pool"""
+        if cls._instance is None:
+            cls._instance = SandboxPool(size)
+        return cls._instance
+
+    def __init__(self, size: Optional[int] = None):
+        """Initialize the pool, reading the size from the environment by default"""
+        if size is None:
+            size = int(os.environ.get(POOL_SIZE_ENV, "0"))
+        self._size = max(size, 0)
+        self._idle: Deque[SandboxManager] = deque()
+        self._leased = 0
+
+        # Register cleanup
+        atexit.register(self.shutdown)
+
+    @property
+    def size(self) -> int:
+        """Get the maximum number of sandboxes owned by the pool"""
+        return self._size
+
+    def acquire(self) -> SandboxManager:
+        """Lease a started sandbox"""
+        if self._idle:
+            logger.debug("Leasing warm sandbox from pool")
+            sandbox = self._idle.popleft()
+        else:
+            sandbox = SandboxManager()
+            sandbox.start(wait=False)
+        self._leased += 1
+
+        # Boot replacements while the leased sandbox is in use
+        self._fill()
+
+        # Waits for a sandbox that is still booting, relaunches a dead one
+        try:
+            sandbox.start()
+        except Exception:
+            self._leased -= 1
+            self._discard(sandbox)
+            raise
+        return sandbox
+
+    def release(self, sandbox: SandboxManager):
+        """Return a leased sandbox, resetting it to genesis for the next lease"""
+        self._leased = max(self._leased - 1, 0)
+        if len(self._idle) + self._leased < self._size:
+            logger.debug("Returning sandbox to pool")
+            shutil.rmtree(sandbox.home_dir / "checkpoints", ignore_errors=True)
+            sandbox.reset_state(wait=False)
+            self._idle.append(sandbox)
+        else:
+            self._discard(sandbox)
+
+    def shutdown(self):
+        """Stop all idle sandboxes"""
+        while self._idle:
+            self._discard(self._idle.popleft())
+
+    def _fill(self):
+        """Launch sandboxes until the pool is full"""
+        while len(self._idle) + self._leased < self._size:
+            logger.debug("Pre-warming sandbox for pool")
+            sandbox = SandboxManager()
+            sandbox.start(wait=False)
+            self._idle.append(sandbox)
+
+    def _discard(self, sandbox: SandboxManager):
+        """Stop a sandbox and remove its home directory"""
+        sandbox.stop()
+        shutil.rmtree(sandbox.home_dir, ignore_errors=True)
@@ -0,0 +1,147 @@
+# near_pytest/remote_cache.py
+"""Shared stores of compiled contracts, so CI runners can reuse each other's builds."""
+
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Import logger
+from .utils import logger
+from .utils.http import get_session
+
+# Environment variable selecting the remote cache (a directory or an http(s) URL)
+REMOTE_CACHE_ENV = "NEAR_PYTEST_REMOTE_CACHE"
+
+# Magic bytes every WASM module starts with
+WASM_MAGIC = b"\0asm"
+
+_remote_cache: Optional["CacheBackend"] = None
+_remote_cache_configured = False
+
+
+class CacheBackend(ABC):
+    """Store of compiled contracts addressed by their cache key"""
+
+    @abstractmethod
+    def fetch(self, key: str, destination: Path) -> bool:
+        """Download an artifact to ``destination``, returning False if missing"""
+
+    @abstractmethod
+    def publish(self, key: str, source: Path):
+        """Upload an artifact"""
+
+
+class DirectoryCacheBackend(CacheBackend):
+    """Cache stored in a shared directory, e.g. an NFS mount or artifact store"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def fetch(self, key: str, destination: Path) -> bool:
+        source = self.path / f"{key}.wasm"
+        try:
+            with open(source, "rb") as f:
+                magic = f.read(len(WASM_MAGIC))
+        except FileNotFoundError:
+            return False
+        if magic != WASM_MAGIC:
+            raise ValueError(f"Remote cache holds invalid WASM for {key}")
+        _atomic_copy(source, destination)
+        return True
+
+    def publish(self, key: str, source: Path):
+        destination = self.path / f"{key}.wasm"
+        if destination.exists():
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        _atomic_copy(source, destination)
+
+    def __repr__(self):
+        return f"DirectoryCacheBackend({str(self.path)!r})"
+
+
+class HttpCacheBackend(CacheBackend):
+    """Cache served over HTTP: GET and PUT ``{url}/{key}.wasm``"""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 30,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def fetch(self, key: str, destination: Path) -> bool:
+        url = f"{self.url}/{key}.wasm"
+        response = get_session(url).get(url, headers=self.headers, timeout=self.timeout)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        if not response.content.startswith(WASM_MAGIC):
+            raise ValueError(f"Remote cache returned invalid WASM for {key}")
+
+        fd, temp_name = tempfile.mkstemp(
+            dir=destination.parent, prefix=f".{destination.stem}-", suffix=".wasm"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(response.content)
+            os.replace(temp_name, destination)
+        finally:
+            Path(temp_name).unlink(missing_ok=True)
+        return True
+
+    def publish(self, key: str, source: Path):
+        url = f"{self.url}/{key}.wasm"
+        response = get_session(url).put(
+            url,
+            data=source.read_bytes(),
+            headers={"Content-Type": "application/wasm", **self.headers},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+    def __repr__(self):
+        return f"HttpCacheBackend({self.url!r})"
+
+
+def _atomic_copy(source: Path, destination: Path):
+    """Copy a file so that readers never see it partially written"""
+    fd, temp_name = tempfile.mkstemp(
+        dir=destination.parent, prefix=f".{destination.stem}-", suffix=".wasm"
+    )
+    os.close(fd)
+    try:
+        shutil.copyfile(source, temp_name)
+        os.replace(temp_name, destination)
+    finally:
+        Path(temp_name).unlink(missing_ok=True)
+
+
+def get_remote_cache() -> Optional[CacheBackend]:
+    """Get the remote cache, configuring it from the environment on first use"""
+    global _remote_cache, _remote_cache_configured
+
+    if not _remote_cache_configured:
+        location = os.environ.get(REMOTE_CACHE_ENV)
+        if location:
+            if location.startswith(("http://", "https://")):
+                _remote_cache = HttpCacheBackend(location)
+            else:
+                _remote_cache = DirectoryCacheBackend(location.removeprefix("file://"))
+            logger.debug(f"Using remote contract cache: {_remote_cache!r}")
+        _remote_cache_configured = True
+    return _remote_cache
+
+
+def set_remote_cache(backend: Optional[CacheBackend]):
+    """Set the remote cache used by the compiler (None disables it)"""
+    global _remote_cache, _remote_cache_configured
+
+    _remote_cache = backend
+    _remote_cache_configured = True
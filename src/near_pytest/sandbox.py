@@ -10,9 +10,23 @@ from pathlib import Path
 import tempfile
 import shutil
 import socket
+import hashlib
+import threading
+from collections import deque
 
 # Import logger
 from .utils import logger
+from .utils.http import close_session, get_session
+from .state import StateSnapshot, iter_records, record_key
+
+# Arguments used to initialize a sandbox home directory
+INIT_ARGS = ["init", "--chain-id", "localnet"]
+
+# Database files that are never modified once written, safe to hardlink
+IMMUTABLE_DATA_SUFFIXES = (".sst", ".blob")
+
+# Log lines printed once the sandbox RPC server is listening
+READY_MARKERS = ("Starting http server", "RPC server started")
 
 
 class SandboxError(Exception):
@@ -21,6 +35,17 @@ class SandboxError(Exception):
     pass
 
 
+def _link_or_copy(src, dst):
+    """Hardlink immutable database files and copy everything else"""
+    if str(src).endswith(IMMUTABLE_DATA_SUFFIXES):
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
 class SandboxManager:
     """Manages the NEAR sandbox process"""
 
@@ -45,6 +70,14 @@ class SandboxManager:
         )
         self._process = None
         self._binary_path = None
+        self._genesis_records = None
+
+        # Process output and readiness tracking
+        self._output = deque(maxlen=50)
+        self._ready_event = threading.Event()
+        self._launch_time = 0.0
+        self._ready_time = None
+        self.startup_time = None
 
         # Register cleanup
         atexit.register(self.stop)
@@ -55,10 +88,28 @@ class SandboxManager:
             s.bind(("", 0))
             return s.getsockname()[1]
 
-    def start(self):
-        """Start the sandbox process"""
+    @property
+    def home_dir(self) -> Path:
+        """Get the sandbox home directory"""
+        return self._home_dir
+
+    def start(self, wait=True):
+        """Start the sandbox process
+
+        With ``wait=False`` the process is launched and this returns
+        immediately; a later ``start()`` call waits for it to come up.
+        """
         if self.is_running():
             logger.debug("Sandbox already running")
+            if self.startup_time is None:
+                # Launched without waiting and came up in the meantime
+                self._record_startup_time()
+            return
+
+        if self._process is not None:
+            # Launched earlier without waiting and still booting
+            if wait:
+                self._wait_for_start()
             return
 
         # Ensure binary is available
@@ -73,7 +124,7 @@ class SandboxManager:
         validator_key_path = self._home_dir / "validator_key.json"
         if not validator_key_path.exists():
             logger.info("Initializing sandbox...")
-            self._run_command(["init", "--chain-id", "localnet"])
+            self._init_home()
 
         # Start the sandbox
         logger.info(f"Starting sandbox on port {self._port}...")
@@ -92,9 +143,12 @@ class SandboxManager:
             stderr=subprocess.PIPE,
             preexec_fn=os.setsid,
         )
+        self._launch_time = time.monotonic()
+        self._start_output_readers()
 
         # Wait for sandbox to start
-        self._wait_for_start()
+        if wait:
+            self._wait_for_start()
 
     def stop(self):
         """Stop the sandbox process"""
@@ -112,18 +166,46 @@ class SandboxManager:
                     pass
 
             self._process = None
+            close_session(self.rpc_endpoint())
 
     def dump_state(self) -> list:
         """Dump the current state"""
+        state = list(self.iter_state())
+        logger.debug(f"Dumped {len(state)} state records")
+        return state
+
+    def iter_state(self, account_ids=None, record_types=None):
+        """Dump the current state and stream its records
+
+        Records are parsed one at a time, so memory use stays bounded
+        however large the state is.
+
+        Args:
+            account_ids: Only yield records belonging to these accounts
+            record_types: Only yield these record types (e.g. "Account", "Data")
+        """
         logger.info("Dumping sandbox state...")
         self._run_command(["view-state", "dump-state"])
-        state_file = self._home_dir / "output.json"
-        with open(state_file, "r") as f:
-            state = json.load(f)["records"]
-            logger.debug(f"Dumped {len(state)} state records")
-            return state
+        return iter_records(
+            self._home_dir / "output.json",
+            account_ids=account_ids,
+            record_types=record_types,
+        )
 
-    def reset_state(self):
+    def genesis_records(self) -> dict:
+        """Get the genesis state records keyed by state entry (cached)"""
+        if self._genesis_records is None:
+            records = iter_records(self._home_dir / "genesis.json")
+            self._genesis_records = {record_key(record): record for record in records}
+        return self._genesis_records
+
+    def snapshot_state(self) -> StateSnapshot:
+        """Dump the current state as the records changed since genesis"""
+        snapshot = StateSnapshot.from_records(self.iter_state(), self.genesis_records())
+        logger.debug(f"Snapshot holds {len(snapshot)} changed records")
+        return snapshot
+
+    def reset_state(self, wait=True):
         """Reset to genesis state by restarting"""
         logger.info("Resetting sandbox to genesis state...")
         self.stop()
@@ -134,9 +216,52 @@ class SandboxManager:
             shutil.rmtree(data_dir)
 
         # Restart
-        self.start()
+        self.start(wait=wait)
         logger.success("Sandbox reset to genesis state")
 
+    def checkpoint(self, name: str):
+        """Save the data directory so this exact state can be restored later
+
+        The node is stopped while the directory is captured and then
+        restarted. RocksDB table files are hardlinked rather than copied, so
+        checkpointing costs little regardless of state size.
+        """
+        checkpoint_dir = self._get_checkpoint_dir(name)
+        logger.info(f"Creating sandbox checkpoint '{name}'...")
+        self.stop()
+
+        if checkpoint_dir.exists():
+            shutil.rmtree(checkpoint_dir)
+        shutil.copytree(
+            self._home_dir / "data", checkpoint_dir, copy_function=_link_or_copy
+        )
+
+        self.start()
+        logger.success(f"Sandbox checkpoint '{name}' created")
+
+    def restore(self, name: str):
+        """Restart the sandbox from a checkpoint created with checkpoint()"""
+        checkpoint_dir = self._get_checkpoint_dir(name)
+        if not checkpoint_dir.exists():
+            raise SandboxError(f"Checkpoint not found: {name}")
+
+        logger.info(f"Restoring sandbox checkpoint '{name}'...")
+        self.stop()
+
+        data_dir = self._home_dir / "data"
+        if data_dir.exists():
+            shutil.rmtree(data_dir)
+        shutil.copytree(checkpoint_dir, data_dir, copy_function=_link_or_copy)
+
+        self.start()
+        logger.success(f"Sandbox checkpoint '{name}' restored")
+
+    def _get_checkpoint_dir(self, name: str) -> Path:
+        """Get the directory holding a named checkpoint"""
+        if name in ("", ".", "..") or Path(name).name != name:
+            raise SandboxError(f"Invalid checkpoint name: {name}")
+        return self._home_dir / "checkpoints" / name
+
     def rpc_endpoint(self) -> str:
         """Get the RPC endpoint URL"""
         return f"http://localhost:{self._port}"
@@ -153,7 +278,7 @@ class SandboxManager:
 
         # Try connecting to RPC
         try:
-            response = requests.post(
+            response = get_session(self.rpc_endpoint()).post(
                 self.rpc_endpoint(),
                 json={
                     "jsonrpc": "2.0",
@@ -180,9 +305,50 @@ class SandboxManager:
             else:
                 raise SandboxError("Invalid validator key format")
 
-    def _run_command(self, args: list):
+    def _init_home(self):
+        """Initialize the home directory from the cached template"""
+        template_dir = self._get_home_template()
+        logger.debug(f"Copying sandbox home template: {template_dir}")
+        shutil.copytree(template_dir, self._home_dir, dirs_exist_ok=True)
+
+    def _get_home_template(self) -> Path:
+        """Get the initialized home template, running init once per binary"""
+        # Key the template by binary identity and init arguments
+        binary_stat = Path(self._binary_path).resolve().stat()
+        hasher = hashlib.sha256()
+        hasher.update(str(Path(self._binary_path).resolve()).encode())
+        hasher.update(f"{binary_stat.st_size}:{binary_stat.st_mtime_ns}".encode())
+        hasher.update(" ".join(INIT_ARGS).encode())
+        template_key = hasher.hexdigest()[:16]
+
+        templates_dir = Path.home() / ".near-pytest" / "templates"
+        template_dir = templates_dir / template_key
+        if (template_dir / "validator_key.json").exists():
+            return template_dir
+
+        # Initialize into a scratch directory and move it into place atomically
+        logger.info("Creating sandbox home template...")
+        templates_dir.mkdir(parents=True, exist_ok=True)
+        scratch_dir = Path(
+            tempfile.mkdtemp(prefix=f".{template_key}-", dir=templates_dir)
+        )
+        try:
+            self._run_command(INIT_ARGS, home_dir=scratch_dir)
+            os.rename(scratch_dir, template_dir)
+        except OSError:
+            # Another process created the template first
+            if not (template_dir / "validator_key.json").exists():
+                raise
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        logger.success(f"Sandbox home template created: {template_dir}")
+        return template_dir
+
+    def _run_command(self, args: list, home_dir=None):
         """Run a sandbox command"""
-        cmd = [self._binary_path, "--home", str(self._home_dir)] + args
+        home_dir = home_dir or self._home_dir
+        cmd = [self._binary_path, "--home", str(home_dir)] + args
         logger.debug(f"Running command: {' '.join(str(x) for x in cmd)}")
         try:
             result = subprocess.run(
@@ -195,15 +361,63 @@ class SandboxManager:
             logger.error(f"Sandbox command failed: {error_msg}")
             raise SandboxError(f"Sandbox command failed: {error_msg}")
 
-    def _wait_for_start(self, timeout=30, interval=0.5):
-        """Wait for sandbox to start"""
+    def _start_output_readers(self):
+        """Drain the process output, watching for the RPC readiness log line"""
+        self._ready_event.clear()
+        self._output.clear()
+        self._ready_time = None
+        self.startup_time = None
+        for stream in (self._process.stdout, self._process.stderr):
+            threading.Thread(
+                target=self._read_output, args=(stream,), daemon=True
+            ).start()
+
+    def _read_output(self, stream):
+        """Read lines from a process stream until it closes"""
+        for raw_line in iter(stream.readline, b""):
+            line = raw_line.decode(errors="replace").rstrip()
+            self._output.append(line)
+            if any(marker in line for marker in READY_MARKERS):
+                if self._ready_time is None:
+                    self._ready_time = time.monotonic()
+                self._ready_event.set()
+        stream.close()
+
+    def _record_startup_time(self):
+        """Record how long the running sandbox took to come up
+
+        Measured up to the readiness log line, so time a pre-launched sandbox
+        spent idle before it was leased isn't counted.
+        """
+        ready_time = self._ready_time or time.monotonic()
+        self.startup_time = ready_time - self._launch_time
+
+    def _wait_for_start(self, timeout=30, max_interval=0.5):
+        """Wait for sandbox to start
+
+        Wakes up as soon as the RPC server logs that it is listening, and
+        otherwise probes the status endpoint with exponential backoff.
+        """
         logger.info(f"Waiting for sandbox to start (timeout: {timeout}s)...")
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        start_time = time.monotonic()
+        interval = 0.01
+        while time.monotonic() - start_time < timeout:
             if self.is_running():
-                logger.success("Sandbox started successfully")
+                self._record_startup_time()
+                logger.success(
+                    f"Sandbox started successfully in {self.startup_time:.2f}s"
+                )
                 return
-            time.sleep(interval)
+
+            if self._process is None:
+                output = "\n".join(self._output)
+                raise SandboxError(f"Sandbox exited during startup:\n{output}")
+
+            if self._ready_event.is_set():
+                time.sleep(interval)
+            else:
+                self._ready_event.wait(interval)
+            interval = min(interval * 2, max_interval)
 
         self.stop()
         raise SandboxError(f"Sandbox failed to start within {timeout} seconds")
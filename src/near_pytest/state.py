@@ -0,0 +1,342 @@
+"""
+State record helpers for the NEAR sandbox.
+
+Records use the JSON layout of genesis files and `view-state dump-state`
+output, which is also what `sandbox_patch_state` accepts.
+"""
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import base58
+
+# Code hash of an account without a contract
+EMPTY_CODE_HASH = "11111111111111111111111111111111"
+
+# Storage accounting constants from the protocol's runtime config
+STORAGE_NUM_BYTES_ACCOUNT = 100
+STORAGE_NUM_EXTRA_BYTES_RECORD = 40
+
+# Borsh sizes of an ed25519 public key and a full access key
+_PUBLIC_KEY_BYTES = 33
+_FULL_ACCESS_KEY_BYTES = 9
+
+StateRecord = Dict[str, Any]
+RecordKey = Tuple[str, ...]
+
+# Characters read from a state file at a time when streaming records
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Fields identifying the state entry each record type writes to
+_RECORD_KEY_FIELDS = {
+    "Account": ("account_id",),
+    "AccessKey": ("account_id", "public_key"),
+    "Contract": ("account_id",),
+    "Data": ("account_id", "data_key"),
+    "ReceivedData": ("account_id", "data_id"),
+}
+
+
+def _to_bytes(value: Union[str, bytes]) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def code_hash(code: bytes) -> str:
+    """Get the base58 code hash of a contract, as stored on accounts"""
+    return base58.b58encode(hashlib.sha256(code).digest()).decode("utf-8")
+
+
+def access_key_storage_usage() -> int:
+    """Get the storage used by one full access key"""
+    return STORAGE_NUM_EXTRA_BYTES_RECORD + _PUBLIC_KEY_BYTES + _FULL_ACCESS_KEY_BYTES
+
+
+def data_storage_usage(key: Union[str, bytes], value: Union[str, bytes]) -> int:
+    """Get the storage used by one contract data entry"""
+    return STORAGE_NUM_EXTRA_BYTES_RECORD + len(_to_bytes(key)) + len(_to_bytes(value))
+
+
+def account_record(
+    account_id: str,
+    amount: int,
+    locked: int = 0,
+    code_hash: str = EMPTY_CODE_HASH,
+    storage_usage: int = STORAGE_NUM_BYTES_ACCOUNT,
+) -> StateRecord:
+    """Build an Account record"""
+    return {
+        "Account": {
+            "account_id": account_id,
+            "account": {
+                "amount": str(amount),
+                "locked": str(locked),
+                "code_hash": code_hash,
+                "storage_usage": storage_usage,
+                "version": "V1",
+            },
+        }
+    }
+
+
+def access_key_record(account_id: str, public_key: str, nonce: int = 0) -> StateRecord:
+    """Build a full access AccessKey record"""
+    return {
+        "AccessKey": {
+            "account_id": account_id,
+            "public_key": public_key,
+            "access_key": {"nonce": nonce, "permission": "FullAccess"},
+        }
+    }
+
+
+def contract_record(account_id: str, code: bytes) -> StateRecord:
+    """Build a Contract record holding the given code"""
+    return {
+        "Contract": {
+            "account_id": account_id,
+            "code": base64.b64encode(code).decode("utf-8"),
+        }
+    }
+
+
+def data_record(
+    account_id: str, key: Union[str, bytes], value: Union[str, bytes]
+) -> StateRecord:
+    """Build a contract Data record"""
+    return {
+        "Data": {
+            "account_id": account_id,
+            "data_key": base64.b64encode(_to_bytes(key)).decode("utf-8"),
+            "value": base64.b64encode(_to_bytes(value)).decode("utf-8"),
+        }
+    }
+
+
+class _JsonStream:
+    """Decodes consecutive JSON values from a file without reading it whole"""
+
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, f):
+        self._file = f
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping what was already consumed"""
+        if self._eof:
+            return False
+        chunk = self._file.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Get the next non-whitespace character without consuming it"""
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in self._WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char: str):
+        """Consume the next non-whitespace character, which must be ``char``"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON input, found {found!r}")
+        self._pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending exactly at the buffer end may be truncated
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_records(
+    path: Union[str, Path],
+    account_ids: Optional[Collection[str]] = None,
+    record_types: Optional[Collection[str]] = None,
+) -> Iterator[StateRecord]:
+    """Stream the records of a genesis or state dump file.
+
+    Only the record being yielded is held in memory, so arbitrarily large
+    dumps can be scanned.
+
+    Args:
+        path: Path to the JSON file with a top-level "records" array
+        account_ids: Only yield records belonging to these accounts
+        record_types: Only yield these record types (e.g. "Account", "Data")
+
+    Yields:
+        State records in file order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+
+        # Skip top-level fields until the records array
+        stream.expect("{")
+        while True:
+            if stream.peek() == "}":
+                return
+            key = stream.decode()
+            stream.expect(":")
+            if key == "records":
+                break
+            stream.decode()
+            if stream.peek() == ",":
+                stream.expect(",")
+
+        stream.expect("[")
+        if stream.peek() == "]":
+            return
+        while True:
+            record = stream.decode()
+            record_type, body = next(iter(record.items()))
+            if (record_types is None or record_type in record_types) and (
+                account_ids is None or body.get("account_id") in account_ids
+            ):
+                yield record
+            if stream.peek() == "]":
+                return
+            stream.expect(",")
+
+
+def record_key(record: StateRecord) -> RecordKey:
+    """Get the identity of the state entry a record writes to"""
+    record_type, body = next(iter(record.items()))
+    fields = _RECORD_KEY_FIELDS.get(record_type)
+    if fields is None:
+        # Receipts are only identified by their full content
+        return (record_type, json.dumps(body, sort_keys=True))
+    return (record_type,) + tuple(body[field] for field in fields)
+
+
+class StateSnapshot:
+    """Sandbox state stored as the records that differ from a baseline.
+
+    The baseline is normally the genesis state, so a snapshot only holds
+    what tests and fixtures changed. Restoring it patches only the records
+    that changed since the snapshot was taken.
+
+    Records created after the snapshot (new accounts, access keys or contract
+    storage keys) cannot be removed through state patching and are left in
+    place; restore_records() reports them. Access key nonces are never
+    rewound, so nonces used since the snapshot aren't handed out again.
+
+    Baseline entries already deleted when the snapshot was taken are kept
+    as ``None`` tombstones in ``changes``, so restoring doesn't revive them.
+    """
+
+    def __init__(
+        self,
+        baseline: Dict[RecordKey, StateRecord],
+        changes: Dict[RecordKey, Optional[StateRecord]],
+    ):
+        self.baseline = baseline
+        self.changes = changes
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[StateRecord], baseline: Dict[RecordKey, StateRecord]
+    ) -> "StateSnapshot":
+        """Create a snapshot from a full set of state records"""
+        changes: Dict[RecordKey, Optional[StateRecord]] = {}
+        seen = set()
+        for record in records:
+            key = record_key(record)
+            seen.add(key)
+            if baseline.get(key) != record:
+                changes[key] = record
+        for key in baseline.keys() - seen:
+            changes[key] = None
+        return cls(baseline, changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def get(self, key: RecordKey) -> Optional[StateRecord]:
+        """Get the snapshot's record for a state entry"""
+        return self.changes.get(key, self.baseline.get(key))
+
+    def restore_records(
+        self,
+        current_records: Iterable[StateRecord],
+        created: Optional[List[RecordKey]] = None,
+    ) -> List[StateRecord]:
+        """Get the records to patch to return from the current state to this one
+
+        Args:
+            current_records: The current state records
+            created: If given, the keys of entries created since the snapshot
+                (which patching can't remove) are appended to it
+        """
+        patch = []
+        seen = set()
+        for record in current_records:
+            key = record_key(record)
+            seen.add(key)
+            target = self.get(key)
+            if target is None:
+                if created is not None and key[0] in _RECORD_KEY_FIELDS:
+                    created.append(key)
+                continue
+            if "AccessKey" in target:
+                target = _with_current_nonce(target, record)
+            if target != record:
+                patch.append(target)
+
+        # Entries removed since the snapshot was taken
+        for key in self.changes.keys() | self.baseline.keys():
+            if key not in seen:
+                target = self.get(key)
+                if target is not None:
+                    patch.append(target)
+        return patch
+
+
+def _with_current_nonce(target: StateRecord, current: StateRecord) -> StateRecord:
+    """Keep the larger nonce of an AccessKey record and its current state"""
+    target_key = target["AccessKey"]["access_key"]
+    nonce = current["AccessKey"]["access_key"].get("nonce", 0)
+    if nonce <= target_key.get("nonce", 0):
+        return target
+    return {
+        "AccessKey": {
+            **target["AccessKey"],
+            "access_key": {**target_key, "nonce": nonce},
+        }
+    }
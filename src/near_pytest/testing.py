@@ -1,7 +1,9 @@
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, ClassVar
+from typing import Dict, Any, Optional, Union, ClassVar, List
 
 from .sandbox import SandboxManager
+from .state import StateSnapshot
+from .pool import SandboxPool
 from .client import NearClient
 from .models import Account, Contract
 from .utils import logger
@@ -13,7 +15,7 @@ class NearTestCase:
     # Class-level shared resources with proper type annotations
     _sandbox: ClassVar[Optional[SandboxManager]] = None
     _client: ClassVar[Optional[NearClient]] = None
-    _initial_state: ClassVar[Optional[list]] = None
+    _initial_state: ClassVar[Optional[StateSnapshot]] = None
 
     # Account references that will be dynamically created
     master: ClassVar[Optional[Account]] = None
@@ -24,11 +26,9 @@ class NearTestCase:
         print()
         logger.info(f"Setting up {cls.__name__} test class")
 
-        # Create a new sandbox instance for this test class
-        cls._sandbox = SandboxManager()
+        # Lease a started sandbox instance for this test class
+        cls._sandbox = SandboxPool.get_instance().acquire()
         if cls._sandbox:
-            cls._sandbox.start()
-
             # Create the client
             cls._client = NearClient(
                 cls._sandbox.rpc_endpoint(),
@@ -43,22 +43,47 @@ class NearTestCase:
     @classmethod
     def teardown_class(cls):
         """Tear down shared resources for the test class"""
+        if cls._client:
+            cls._client.close()
+            cls._client = None
         if cls._sandbox:
-            cls._sandbox.stop()
+            SandboxPool.get_instance().release(cls._sandbox)
             cls._sandbox = None
 
     @classmethod
     def compile_contract(
-        cls, contract_path: Union[str, Path], single_file: bool = False
+        cls,
+        contract_path: Union[str, Path],
+        single_file: bool = False,
+        hash_mode: Optional[str] = None,
+        optimize: bool = False,
     ) -> Path:
         """Compile a contract"""
         from .compiler import compile_contract
 
         logger.info(f"Compiling contract: {contract_path}")
-        result = compile_contract(contract_path, single_file)
+        result = compile_contract(contract_path, single_file, hash_mode, optimize)
         logger.success(f"Contract compiled: {result}")
         return result
 
+    @classmethod
+    def compile_contracts(
+        cls,
+        contract_paths: List[Union[str, Path]],
+        single_file: bool = False,
+        hash_mode: Optional[str] = None,
+        optimize: bool = False,
+    ) -> List[Path]:
+        """Compile several contracts in parallel"""
+        from .compiler import compile_contracts
+
+        logger.info(f"Compiling {len(contract_paths)} contracts")
+        result = compile_contracts(
+            contract_paths, single_file, hash_mode=hash_mode, optimize=optimize
+        )
+        logger.success(f"Contracts compiled: {', '.join(map(str, result))}")
+        return result
+
     @classmethod
     def create_account(
         cls, name: str, initial_balance: Optional[int] = None
@@ -86,6 +111,7 @@ class NearTestCase:
         account: Account,
         wasm_path: Union[str, Path],
         init_args: Optional[Dict[str, Any]] = None,
+        reuse_code: bool = False,
     ) -> Contract:
         """Deploy a contract to an account"""
         if cls._client is None:
@@ -97,7 +123,7 @@ class NearTestCase:
         # Deploy the contract
         logger.info(f"Deploying contract to {account.account_id}")
         logger.debug(f"WASM path: {wasm_path}")
-        account.deploy_contract(wasm_path)
+        account.deploy_contract(wasm_path, reuse_code=reuse_code)
 
         # Call the init method if args provided
         if init_args:
@@ -126,8 +152,9 @@ class NearTestCase:
             )
 
         logger.info("Saving current state for later reset")
-        cls._initial_state = cls._sandbox.dump_state()
-        logger.success(f"State saved with {len(cls._initial_state)} records")
+        # Only the records changed since genesis are kept in memory
+        cls._initial_state = cls._sandbox.snapshot_state()
+        logger.success(f"State saved with {len(cls._initial_state)} changed records")
 
     def reset_state(self):
         """Reset to the previously saved state"""
@@ -138,23 +165,17 @@ class NearTestCase:
             )
             return False
 
-        if self.__class__._client is None:
+        if self.__class__._client is None or self.__class__._sandbox is None:
             logger.error("Client not initialized. Make sure setup_class was called.")
             raise RuntimeError(
                 "Client not initialized. Make sure setup_class was called."
             )
 
         logger.info("Resetting state to initial snapshot")
-        result = self.__class__._client._run_async(
-            self.__class__._client._master_account.provider.json_rpc(
-                "sandbox_patch_state", {"records": self.__class__._initial_state}
-            )
+        records = self.__class__._initial_state.restore_records(
+            self.__class__._sandbox.iter_state()
         )
-
-        if result == {}:
-            success = True
-        else:
-            success = False
+        success = not records or self.__class__._client.patch_state(records)
 
         if success:
             logger.success("Successfully reset state to initial snapshot")
@@ -1,13 +1,13 @@
 import os
 import platform
 import shutil
-import requests
 import tarfile
 from pathlib import Path
 import tempfile
 
 # Import logger
 from ..utils import logger
+from .http import get_session
 
 # Default sandbox version
 DEFAULT_VERSION = "2.4.0"
@@ -82,7 +82,7 @@ def download_binary(version=DEFAULT_VERSION):
 
         try:
             # Download the tar.gz file with requests
-            response = requests.get(url, stream=True)
+            response = get_session(url).get(url, stream=True)
             response.raise_for_status()  # Raise an exception for HTTP errors
 
             with open(tar_path, "wb") as f:
@@ -0,0 +1,54 @@
+# src/near_pytest/utils/http.py
+"""Shared HTTP sessions, so repeated requests reuse keep-alive connections."""
+
+import os
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Maximum idle connections kept open per origin
+POOL_MAXSIZE = 16
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url: str) -> requests.Session:
+    """Get the pooled session shared by all requests to the origin of ``url``"""
+    origin = _get_origin(url)
+    with _sessions_lock:
+        session = _sessions.get(origin)
+        if session is None:
+            session = requests.Session()
+            session.mount(
+                origin, HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            )
+            _sessions[origin] = session
+        return session
+
+
+def close_session(url: str):
+    """Close the pooled connections to the origin of ``url``"""
+    with _sessions_lock:
+        session = _sessions.pop(_get_origin(url), None)
+    if session is not None:
+        session.close()
+
+
+def _forget_sessions():
+    """Drop sessions inherited by a forked process, whose sockets are shared"""
+    global _sessions_lock
+
+    _sessions.clear()
+    _sessions_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_sessions)
@@ -0,0 +1,60 @@
+# src/near_pytest/utils/locking.py
+"""Advisory file locks shared between processes (e.g. pytest-xdist workers)."""
+
+import os
+import fcntl
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+# Import logger
+from ..utils import logger
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on ``path``, blocking until it is available
+
+    Lock files may be deleted by remove_lock_file(); a lock obtained on a file
+    deleted in the meantime is dropped and taken again on the new file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        with open(path, "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.debug(f"Waiting for lock: {path}")
+                fcntl.flock(f, fcntl.LOCK_EX)
+            if not _is_current(f, path):
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            return
+
+
+def remove_lock_file(path: Path) -> bool:
+    """Delete a lock file unless it is held, returning whether it was deleted"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return False
+    with f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        if not _is_current(f, path):
+            return False
+        path.unlink()
+        return True
+
+
+def _is_current(f: IO, path: Path) -> bool:
+    """Check that an open lock file is still the one at ``path``"""
+    try:
+        return os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return False
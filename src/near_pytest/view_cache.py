@@ -0,0 +1,75 @@
+# near_pytest/view_cache.py
+"""Cache of view function results, valid until the chain moves on."""
+
+import copy
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from py_near.providers import JsonProvider
+
+# Seconds between checks of the chain height. Results are reused for at most
+# this long after another client's transaction landed.
+HEIGHT_CHECK_INTERVAL = 0.5
+
+ViewKey = Tuple[str, str, str]
+
+
+class ViewCache:
+    """View results by (contract, method, canonical args) for the current block
+
+    Entries are dropped when the chain height advances, and by the client
+    whenever it changes state itself (transactions, state patches, restores).
+    The cache can be shared between clients (e.g. one per event loop).
+    """
+
+    def __init__(self, height_check_interval: float = HEIGHT_CHECK_INTERVAL):
+        self.height_check_interval = height_check_interval
+        self._results: Dict[ViewKey, Any] = {}
+        self._height = 0
+        self._checked_at = 0.0
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped whenever the entries are dropped"""
+        return self._generation
+
+    @staticmethod
+    def key(
+        contract_id: str, method_name: str, args: Optional[Dict[str, Any]]
+    ) -> ViewKey:
+        """Build the cache key of a view call"""
+        canonical_args = json.dumps(args or {}, sort_keys=True, separators=(",", ":"))
+        return contract_id, method_name, canonical_args
+
+    async def refresh(self, provider: JsonProvider):
+        """Drop all entries if the chain height advanced since the last check"""
+        if time.monotonic() - self._checked_at < self.height_check_interval:
+            return
+        status = await provider.get_status()
+        height = status["sync_info"]["latest_block_height"]
+        if height != self._height:
+            self.invalidate()
+            self._height = height
+        self._checked_at = time.monotonic()
+
+    def get(self, key: ViewKey) -> Tuple[bool, Any]:
+        """Look up a result, returning whether it was cached and a copy of it"""
+        if key not in self._results:
+            return False, None
+        # Copy, so callers mutating a result don't alter later hits
+        return True, copy.deepcopy(self._results[key])
+
+    def put(self, key: ViewKey, result: Any, generation: int):
+        """Store a result fetched while the cache was at ``generation``
+
+        Results whose request raced with an invalidation are not stored.
+        """
+        if generation == self._generation:
+            self._results[key] = copy.deepcopy(result)
+
+    def invalidate(self):
+        """Drop all entries, e.g. after this client changed state"""
+        self._results.clear()
+        self._generation += 1
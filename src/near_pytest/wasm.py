@@ -0,0 +1,96 @@
+# near_pytest/wasm.py
+"""WebAssembly post-processing: size optimization and stripping of custom sections."""
+
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Import logger
+from .utils import logger
+
+# Magic and version every WASM module starts with
+WASM_HEADER = b"\0asm\x01\0\0\0"
+
+# Section id of custom sections (names, producers, debug info, ...)
+CUSTOM_SECTION_ID = 0
+
+# Arguments passed to binaryen's wasm-opt
+WASM_OPT_ARGS = ["-Oz", "--strip-debug", "--strip-producers"]
+
+
+def _read_leb128(data: bytes, offset: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 integer, returning it and the next offset"""
+    result = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated WebAssembly module")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
+
+
+def strip_custom_sections(data: bytes) -> bytes:
+    """Remove all custom sections from a WASM module"""
+    if not data.startswith(WASM_HEADER):
+        raise ValueError("Not a WebAssembly module")
+
+    output = bytearray(WASM_HEADER)
+    offset = len(WASM_HEADER)
+    while offset < len(data):
+        section_start = offset
+        size, payload_start = _read_leb128(data, offset + 1)
+        offset = payload_start + size
+        if offset > len(data):
+            raise ValueError("Truncated WebAssembly section")
+        if data[section_start] != CUSTOM_SECTION_ID:
+            output += data[section_start:offset]
+    return bytes(output)
+
+
+@lru_cache(maxsize=None)
+def get_wasm_opt_version() -> Optional[str]:
+    """Get the version of wasm-opt on PATH, or None if it isn't installed"""
+    wasm_opt = shutil.which("wasm-opt")
+    if wasm_opt is None:
+        return None
+    try:
+        result = subprocess.run(
+            [wasm_opt, "--version"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def optimize_wasm(source: Path, destination: Path):
+    """Shrink a WASM module with wasm-opt (if installed) and strip custom sections"""
+    data = source.read_bytes()
+
+    if get_wasm_opt_version() is not None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            optimized_path = Path(temp_dir) / "optimized.wasm"
+            result = subprocess.run(
+                ["wasm-opt", *WASM_OPT_ARGS, str(source), "-o", str(optimized_path)],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode == 0:
+                data = optimized_path.read_bytes()
+            else:
+                logger.warning(
+                    f"wasm-opt failed, only stripping custom sections: {result.stderr.strip()}"
+                )
+    else:
+        logger.debug("wasm-opt not found, only stripping custom sections")
+
+    data = strip_custom_sections(data)
+    destination.write_bytes(data)
+    logger.info(
+        f"Optimized {source.name}: {source.stat().st_size} -> {len(data)} bytes"
+    )
@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import json
+
+import base58
+import pytest
+from py_near.account import Account as PyNearAccount
+
+from near_pytest import client as client_module
+from near_pytest import compiler, remote_cache, state
+from near_pytest.client import AsyncNearClient, _generate_key_pair
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """An empty compile cache in a temporary home directory"""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    for env in (
+        compiler.HASH_MODE_ENV,
+        compiler.CACHE_MAX_BYTES_ENV,
+        compiler.CACHE_MAX_AGE_DAYS_ENV,
+        remote_cache.REMOTE_CACHE_ENV,
+    ):
+        monkeypatch.delenv(env, raising=False)
+    monkeypatch.setattr(compiler, "_file_hashes", None)
+    monkeypatch.setattr(compiler, "_file_hashes_dirty", False)
+    monkeypatch.setattr(remote_cache, "_remote_cache", None)
+    monkeypatch.setattr(remote_cache, "_remote_cache_configured", True)
+    return compiler._get_cache_dir()
+
+
+@pytest.fixture
+def fake_nearc(monkeypatch):
+    """Replace the nearc build with one writing a WASM header and the source"""
+    builds = []
+
+    def build(contract_path, output_path, single_file):
+        builds.append(contract_path)
+        output_path.write_bytes(b"\0asm\x01\0\0\0" + contract_path.read_bytes())
+
+    monkeypatch.setattr(compiler, "_build_contract", build)
+    return builds
+
+
+class StubProvider:
+    """Stands in for py-near's JsonProvider, serving a tiny in-memory chain
+
+    Transactions and state patches bump ``counter``, which views return, and
+    the block hash follows ``height``.
+    """
+
+    READ_DELAY = 0.01
+
+    def __init__(self, chain_nonce=10):
+        self.height = 1
+        self.chain_nonce = chain_nonce
+        self.nonces = {}  # On-chain nonces by account ID, else chain_nonce
+        self.accounts = {}  # view_account results by account ID
+        self.codes = {}  # Deployed contract code by account ID
+        self.counter = 0
+        self.patches = []  # Records of each sandbox_patch_state call
+        self.transactions = []  # Hashes of the submitted transactions
+        self.read_delays = []  # Delays of the next reads, else READ_DELAY
+        self.status_calls = self.access_key_fetches = self.view_calls = 0
+        self.in_flight = self.max_in_flight = 0
+
+    async def _read(self, value):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(
+            self.read_delays.pop(0) if self.read_delays else self.READ_DELAY
+        )
+        self.in_flight -= 1
+        return value
+
+    async def get_status(self):
+        self.status_calls += 1
+        block_hash = base58.b58encode(bytes([self.height]) * 32).decode()
+        # Yield, so concurrent callers all reach the request
+        return await self._read(
+            {
+                "chain_id": "localnet",
+                "sync_info": {
+                    "latest_block_hash": block_hash,
+                    "latest_block_height": self.height,
+                },
+            }
+        )
+
+    async def get_access_key(self, account_id, public_key):
+        self.access_key_fetches += 1
+        nonce = self.nonces.get(account_id, self.chain_nonce)
+        return await self._read(
+            {
+                "block_hash": "",
+                "block_height": self.height,
+                "nonce": nonce,
+                "permission": "FullAccess",
+            }
+        )
+
+    async def view_call(self, contract_id, method_name, args, **kwargs):
+        self.view_calls += 1
+        value = {
+            "contract": contract_id,
+            "method": method_name,
+            "args": json.loads(args),
+            "count": self.counter,
+        }
+        result = await self._read(list(json.dumps(value).encode()))
+        return {"result": result, "logs": [], "block_height": self.height}
+
+    async def get_account(self, account_id):
+        account = self.accounts.get(account_id)
+        if account is None:
+            account = {
+                "amount": str(10**27),
+                "locked": "0",
+                "code_hash": state.EMPTY_CODE_HASH,
+                "storage_usage": state.STORAGE_NUM_BYTES_ACCOUNT
+                + state.access_key_storage_usage(),
+            }
+        return await self._read(dict(account))
+
+    async def query(self, params):
+        assert params["request_type"] == "view_code"
+        code = self.codes[params["account_id"]]
+        return await self._read({"code_base64": base64.b64encode(code).decode()})
+
+    async def send_tx_and_wait(self, serialized_tx, trx_hash, receiver_id):
+        await asyncio.sleep(0)
+        self.counter += 1
+        self.transactions.append(trx_hash)
+        return trx_hash
+
+    async def json_rpc(self, method, params):
+        await asyncio.sleep(0)
+        assert method == "sandbox_patch_state"
+        self.counter += 1
+        self.patches.append(params["records"])
+        return {}
+
+    async def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def stub_provider(monkeypatch):
+    """A StubProvider used by every NEAR client created in the test"""
+    provider = StubProvider()
+    monkeypatch.setattr(client_module, "_JsonProvider", lambda endpoint: provider)
+    return provider
+
+
+@pytest.fixture
+def pynear_nonces(monkeypatch):
+    """Isolate py-near's class-wide access key nonce counter"""
+    nonces = type(PyNearAccount._access_key_nonce)(int)
+    monkeypatch.setattr(PyNearAccount, "_access_key_nonce", nonces)
+    return nonces
+
+
+@pytest.fixture
+def make_client(stub_provider, pynear_nonces):
+    """Create async clients of test.near served by the stub provider"""
+    _, master_key = _generate_key_pair()
+
+    def make(**kwargs):
+        return AsyncNearClient("http://localhost:1", "test.near", master_key, **kwargs)
+
+    return make
@@ -0,0 +1,45 @@
+import json
+import time
+
+from near_pytest import compiler
+from near_pytest.cli import main
+from near_pytest.compiler import compile_contract
+
+
+def test_cache_prune_prints_removed_artifacts(cache_dir, fake_nearc, tmp_path, capsys):
+    contract = tmp_path / "contract.py"
+    contract.write_text("X = 1\n")
+    wasm_path = compile_contract(contract, single_file=True)
+    manifest_path = cache_dir / compiler.MANIFEST_FILENAME
+    manifest = json.loads(manifest_path.read_text())
+    for entry in manifest["entries"].values():
+        entry["last_access"] = time.time() - 3 * 86400
+    manifest_path.write_text(json.dumps(manifest))
+
+    assert main(["cache", "prune", "--max-age", "7"]) == 0
+    assert capsys.readouterr().out == ""
+
+    assert main(["cache", "prune", "--max-age", "1", "--dry-run"]) == 0
+    assert capsys.readouterr().out == f"{wasm_path}\n"
+    assert wasm_path.exists()
+
+    assert main(["cache", "prune", "--max-bytes", "0"]) == 0
+    assert capsys.readouterr().out == f"{wasm_path}\n"
+    assert not wasm_path.exists()
+
+
+def test_cache_prune_defaults_to_environment(
+    cache_dir, fake_nearc, tmp_path, monkeypatch
+):
+    contract = tmp_path / "contract.py"
+    contract.write_text("X = 1\n")
+    wasm_path = compile_contract(contract, single_file=True)
+
+    monkeypatch.setenv(compiler.CACHE_MAX_BYTES_ENV, "0")
+    assert main(["cache", "prune"]) == 0
+    assert not wasm_path.exists()
+
+
+def test_cache_prune_reports_invalid_size(cache_dir, capsys):
+    assert main(["cache", "prune", "--max-bytes", "lots"]) == 1
+    assert "Invalid size" in capsys.readouterr().err
@@ -0,0 +1,367 @@
+import asyncio
+from collections import OrderedDict
+
+import base58
+import httpx
+import pytest
+from py_near import transactions
+from nacl.signing import SigningKey
+from py_near.exceptions.provider import InvalidNonce
+
+from near_pytest import client as client_module
+from near_pytest import state
+from near_pytest.client import (
+    AsyncNearClient,
+    NearClient,
+    _generate_key_pair,
+    _read_wasm,
+)
+
+
+@pytest.fixture
+def signed_nonces(monkeypatch):
+    """Record the nonce of every transaction signed"""
+    nonces = []
+    original = transactions.sign_and_serialize_transaction
+
+    def sign(account_id, pk, receiver_id, nonce, actions, block_hash):
+        nonces.append(nonce)
+        return original(account_id, pk, receiver_id, nonce, actions, block_hash)
+
+    monkeypatch.setattr(transactions, "sign_and_serialize_transaction", sign)
+    return nonces
+
+
+@pytest.mark.parametrize("cache_chain_metadata", [False, True])
+def test_concurrent_calls_from_new_account_get_distinct_nonces(
+    make_client, stub_provider, signed_nonces, cache_chain_metadata
+):
+    client = make_client(cache_chain_metadata=cache_chain_metadata)
+
+    async def run():
+        await asyncio.gather(
+            *(
+                client.call_function("test.near", "counter.test.near", "increment")
+                for _ in range(4)
+            )
+        )
+
+    asyncio.run(run())
+
+    chain_nonce = stub_provider.chain_nonce
+    assert sorted(signed_nonces) == [chain_nonce + i for i in range(1, 5)]
+    assert stub_provider.access_key_fetches == 1
+
+
+def test_rejected_nonce_is_resynced_and_retried(
+    make_client, stub_provider, signed_nonces
+):
+    client = make_client()
+    provider = stub_provider
+    attempts = []
+
+    async def send_tx_and_wait(serialized_tx, trx_hash, receiver_id):
+        attempts.append(trx_hash)
+        if len(attempts) == 1:
+            nonce = provider.chain_nonce + 1
+            raise InvalidNonce({"tx_nonce": nonce, "ak_nonce": nonce})
+        return trx_hash
+
+    provider.send_tx_and_wait = send_tx_and_wait
+    asyncio.run(client.call_function("test.near", "counter.test.near", "increment"))
+
+    assert len(attempts) == 2
+    assert signed_nonces[1] > signed_nonces[0]
+    assert provider.access_key_fetches == 2
+
+
+def test_accounts_share_the_client_provider(monkeypatch):
+    http_clients = []
+    original_init = httpx.AsyncClient.__init__
+
+    def init(self, *args, **kwargs):
+        http_clients.append(self)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(httpx.AsyncClient, "__init__", init)
+    _, master_key = _generate_key_pair()
+    client = AsyncNearClient("http://localhost:1", "test.near", master_key)
+
+    async def run():
+        return [
+            await client._get_or_create_account(f"user{i}.test.near") for i in range(5)
+        ]
+
+    accounts = asyncio.run(run())
+    asyncio.run(client.close())
+    assert {account.provider for account in accounts} == {client._provider}
+    assert len(http_clients) == 1
+    assert accounts[0]._signers[0] == base58.b58decode(
+        client._keys["user0.test.near"].removeprefix("ed25519:")
+    )
+
+
+def test_near_client_close_shuts_down_providers():
+    _, master_key = _generate_key_pair()
+    client = NearClient("http://localhost:1", "test.near", master_key)
+    loop = asyncio.new_event_loop()
+
+    async def get_async_client():
+        return client.async_client
+
+    async_client = loop.run_until_complete(get_async_client())
+    with client:
+        pass
+
+    assert client._async_client._provider._client.is_closed
+    assert async_client._provider._client.is_closed
+    assert client._loop.is_closed()
+    client.close()
+    loop.close()
+
+
+@pytest.fixture
+def read_client(stub_provider):
+    _, master_key = _generate_key_pair()
+    with NearClient(
+        "http://localhost:1", "test.near", master_key, cache_views=False
+    ) as client:
+        yield client
+
+
+def test_request_batch_returns_results_in_queue_order(read_client, stub_provider):
+    client = read_client
+    stub_provider.accounts["alice.test.near"] = {"amount": "1"}
+    # Earlier requests answer last
+    stub_provider.read_delays = [0.03, 0.02, 0.01]
+
+    with client.batch() as batch:
+        first = batch.view_function("a.test.near", "get", {"x": 1})
+        second = batch.view_account("alice.test.near")
+        third = batch.view_function("b.test.near", "list")
+
+    assert (first, second, third) == (0, 1, 2)
+    views = [batch.results[first], batch.results[third]]
+    assert [(view["contract"], view["method"], view["args"]) for view in views] == [
+        ("a.test.near", "get", {"x": 1}),
+        ("b.test.near", "list", {}),
+    ]
+    assert batch.results[second] == {"amount": "1"}
+    assert stub_provider.max_in_flight == 3
+
+
+def test_request_batch_execute_clears_the_queue(read_client, stub_provider):
+    stub_provider.accounts["alice.test.near"] = {"amount": "1"}
+    stub_provider.accounts["bob.test.near"] = {"amount": "2"}
+    batch = read_client.batch()
+    batch.view_account("alice.test.near")
+
+    assert batch.execute() == [{"amount": "1"}]
+    assert batch.view_account("bob.test.near") == 0
+    assert batch.execute() == [{"amount": "2"}]
+    assert batch.execute() == []
+
+
+def test_request_batch_is_not_sent_when_block_raises(read_client, stub_provider):
+    with pytest.raises(RuntimeError):
+        with read_client.batch() as batch:
+            batch.view_account("alice.test.near")
+            raise RuntimeError
+
+    assert batch.results == []
+    assert stub_provider.max_in_flight == 0
+
+
+def _private_key_bytes(private_key):
+    return base58.b58decode(private_key.removeprefix("ed25519:"))[:32]
+
+
+def test_inject_accounts_patches_accounts_and_keys(make_client, stub_provider):
+    client = make_client()
+    account_ids = asyncio.run(client.inject_accounts(["alice", "bob"], 5))
+
+    assert account_ids == ["alice.test.near", "bob.test.near"]
+    [records] = stub_provider.patches
+    assert len(records) == 4
+    for account_id, account, access_key in zip(
+        account_ids, records[::2], records[1::2]
+    ):
+        public_key = base58.b58encode(
+            bytes(SigningKey(_private_key_bytes(client._keys[account_id])).verify_key)
+        ).decode()
+        assert account == state.account_record(account_id, 5, storage_usage=182)
+        assert access_key == state.access_key_record(
+            account_id, f"ed25519:{public_key}"
+        )
+
+
+def test_inject_contract_accounts_for_code_and_data(make_client, stub_provider):
+    client = make_client()
+    stub_provider.accounts["alice.test.near"] = {
+        "amount": "7",
+        "locked": "1",
+        "code_hash": state.EMPTY_CODE_HASH,
+        "storage_usage": 182,
+    }
+    code = b"\0asm\x01\0\0\0" + b"\1" * 100
+    data = {"count": b"\5", b"owner": "alice"}
+
+    assert asyncio.run(client.inject_contract("alice.test.near", code, data))
+
+    [records] = stub_provider.patches
+    assert records == [
+        state.account_record(
+            "alice.test.near",
+            7,
+            1,
+            state.code_hash(code),
+            182 + 108 + (40 + 5 + 1) + (40 + 5 + 5),
+        ),
+        state.contract_record("alice.test.near", code),
+        state.data_record("alice.test.near", "count", b"\5"),
+        state.data_record("alice.test.near", b"owner", "alice"),
+    ]
+
+
+def test_inject_contract_replaces_old_code_in_storage_usage(make_client, stub_provider):
+    client = make_client()
+    old_code = b"\0asm\x01\0\0\0" + b"\1" * 500
+    stub_provider.codes["alice.test.near"] = old_code
+    stub_provider.accounts["alice.test.near"] = {
+        "amount": "7",
+        "locked": "0",
+        "code_hash": state.code_hash(old_code),
+        "storage_usage": 182 + len(old_code) + 50,
+    }
+    code = b"\0asm\x01\0\0\0" + b"\2" * 100
+
+    asyncio.run(client.inject_contract("alice.test.near", code))
+
+    [[account, contract]] = stub_provider.patches
+    assert account["Account"]["account"]["storage_usage"] == 182 + len(code) + 50
+    assert account["Account"]["account"]["code_hash"] == state.code_hash(code)
+    assert contract == state.contract_record("alice.test.near", code)
+
+
+CODE = b"\0asm\x01\0\0\0" + b"\3" * 50
+
+
+def test_deploy_with_reuse_code_patches_known_code(make_client, stub_provider):
+    client = make_client()
+
+    async def main():
+        await client.deploy_contract("a.test.near", CODE, reuse_code=True)
+        return await client.deploy_contract("b.test.near", CODE, reuse_code=True)
+
+    assert asyncio.run(main()) is None
+    assert len(stub_provider.transactions) == 1
+    assert client._code_registry == {state.code_hash(CODE): "a.test.near"}
+    [[account, contract]] = stub_provider.patches
+    assert account["Account"]["account_id"] == "b.test.near"
+    assert account["Account"]["account"]["code_hash"] == state.code_hash(CODE)
+    assert contract == state.contract_record("b.test.near", CODE)
+
+
+def test_deploy_with_reuse_code_skips_account_holding_code(make_client, stub_provider):
+    client = make_client()
+    stub_provider.accounts["b.test.near"] = {
+        "amount": "1",
+        "locked": "0",
+        "code_hash": state.code_hash(CODE),
+        "storage_usage": 182 + len(CODE),
+    }
+
+    async def main():
+        await client.deploy_contract("a.test.near", CODE, reuse_code=True)
+        return await client.deploy_contract("b.test.near", CODE, reuse_code=True)
+
+    assert asyncio.run(main()) is None
+    assert len(stub_provider.transactions) == 1
+    assert stub_provider.patches == []
+
+
+def test_deploy_without_reuse_code_always_sends_transactions(
+    make_client, stub_provider
+):
+    client = make_client()
+
+    async def main():
+        await client.deploy_contract("a.test.near", CODE)
+        await client.deploy_contract("b.test.near", CODE)
+
+    asyncio.run(main())
+    assert len(stub_provider.transactions) == 2
+    assert stub_provider.patches == []
+
+
+def test_code_registry_is_shared_with_async_clients(stub_provider, pynear_nonces):
+    _, master_key = _generate_key_pair()
+    with NearClient("http://localhost:1", "test.near", master_key) as client:
+        client.deploy_contract("a.test.near", CODE)
+
+        async def deploy():
+            return await client.async_client.deploy_contract(
+                "b.test.near", CODE, reuse_code=True
+            )
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(deploy()) is None
+        finally:
+            loop.close()
+
+    assert len(stub_provider.transactions) == 1
+    [[account, _]] = stub_provider.patches
+    assert account["Account"]["account_id"] == "b.test.near"
+
+
+@pytest.fixture
+def wasm_cache(monkeypatch):
+    """An empty WASM file cache"""
+    cache = OrderedDict()
+    monkeypatch.setattr(client_module, "_wasm_cache", cache)
+    monkeypatch.setattr(client_module, "_wasm_cache_bytes", 0)
+    return cache
+
+
+def test_read_wasm_reuses_file_contents(wasm_cache, tmp_path):
+    path = tmp_path / "contract.wasm"
+    path.write_bytes(CODE)
+
+    first = _read_wasm(path)
+    assert first == CODE
+    assert _read_wasm(str(path)) is first
+    assert _read_wasm(CODE) is CODE
+    assert len(wasm_cache) == 1
+
+
+def test_read_wasm_drops_old_versions_of_a_file(wasm_cache, tmp_path):
+    path = tmp_path / "contract.wasm"
+    path.write_bytes(CODE)
+    _read_wasm(path)
+
+    path.write_bytes(CODE + b"\4")
+    assert _read_wasm(path) == CODE + b"\4"
+    assert list(wasm_cache.values()) == [CODE + b"\4"]
+    assert client_module._wasm_cache_bytes == len(CODE) + 1
+
+
+def test_read_wasm_evicts_least_recently_used(wasm_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(client_module, "WASM_CACHE_MAX_BYTES", 25)
+    paths = []
+    for name in "abc":
+        paths.append(tmp_path / f"{name}.wasm")
+        paths[-1].write_bytes(name.encode() * 10)
+
+    _read_wasm(paths[0])
+    _read_wasm(paths[1])
+    _read_wasm(paths[0])
+    _read_wasm(paths[2])
+    assert [key[0] for key in wasm_cache] == [str(paths[0]), str(paths[2])]
+    assert client_module._wasm_cache_bytes == 20
+
+    # Files larger than the budget are read but not cached
+    large = tmp_path / "large.wasm"
+    large.write_bytes(b"x" * 30)
+    assert _read_wasm(large) == b"x" * 30
+    assert len(wasm_cache) == 2
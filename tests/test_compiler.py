@@ -0,0 +1,313 @@
+import json
+import os
+import time
+
+import pytest
+
+from near_pytest import compiler
+from near_pytest.compiler import (
+    CompilerError,
+    compile_contract,
+    compile_contracts,
+    parse_size,
+    prune_cache,
+)
+from near_pytest.utils.locking import file_lock
+
+
+def write_contract(path, source="def get():\n    return 1\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source)
+    return path
+
+
+def test_compile_contract_caches_by_content(cache_dir, fake_nearc, tmp_path):
+    contract = write_contract(tmp_path / "counter" / "contract.py")
+
+    first = compile_contract(contract, single_file=True)
+    assert first.parent == cache_dir
+    assert compile_contract(contract, single_file=True) == first
+    assert len(fake_nearc) == 1
+
+    write_contract(contract, "def get():\n    return 2\n")
+    second = compile_contract(contract, single_file=True)
+    assert second != first
+    assert len(fake_nearc) == 2
+
+
+def test_compile_contract_records_manifest_entry(cache_dir, fake_nearc, tmp_path):
+    contract = write_contract(tmp_path / "contract.py")
+    wasm_path = compile_contract(contract, single_file=True)
+
+    manifest = json.loads((cache_dir / compiler.MANIFEST_FILENAME).read_text())
+    [(key, entry)] = manifest["entries"].items()
+    assert wasm_path.name == entry["wasm"] == f"contract-{key}.wasm"
+    assert entry["contract_path"] == str(contract.resolve())
+    assert entry["size"] == wasm_path.stat().st_size
+    assert entry["single_file"] is True
+
+
+def test_compile_contracts_returns_cached_paths_in_order(
+    cache_dir, fake_nearc, tmp_path
+):
+    contracts = [
+        write_contract(tmp_path / name / "contract.py", f"NAME = {name!r}\n")
+        for name in ("a", "b", "c")
+    ]
+    expected = [compile_contract(path, single_file=True) for path in contracts]
+
+    # Everything is cached, so no worker processes are started
+    assert compile_contracts(contracts[::-1], single_file=True) == expected[::-1]
+    assert len(fake_nearc) == 3
+
+
+def test_compile_contract_passes_wasm_through(cache_dir, tmp_path):
+    wasm_path = tmp_path / "prebuilt.wasm"
+    wasm_path.write_bytes(b"\0asm")
+    assert compile_contract(wasm_path) == wasm_path
+
+
+def age(path, seconds=10):
+    """Move a file's mtime out of the racy window"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10**9))
+
+
+def test_file_digest_is_reused_for_unchanged_stat(cache_dir, tmp_path, monkeypatch):
+    source = write_contract(tmp_path / "contract.py", "X = 1\n")
+    age(source)
+    digest = compiler._get_file_digest(source)
+    compiler._save_file_hashes()
+
+    # Same size, inode and mtime: a fresh process trusts the recorded digest
+    stat = source.stat()
+    source.write_text("X = 2\n")
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    monkeypatch.setattr(compiler, "_file_hashes", None)
+    assert compiler._get_file_digest(source) == digest
+
+    # Any stat change invalidates it
+    age(source)
+    assert compiler._get_file_digest(source) != digest
+
+
+def test_recently_modified_files_are_not_recorded(cache_dir, tmp_path):
+    source = write_contract(tmp_path / "contract.py")
+    compiler._get_file_digest(source)
+    assert str(source) not in compiler._load_file_hashes()
+
+    age(source)
+    compiler._get_file_digest(source)
+    assert str(source) in compiler._load_file_hashes()
+
+
+def test_directory_hash_is_stable_and_location_independent(cache_dir, tmp_path):
+    for root in ("one", "two"):
+        write_contract(tmp_path / root / "a.py", "A = 1\n")
+        write_contract(tmp_path / root / "pkg" / "b.py", "B = 1\n")
+
+    digest = compiler._get_contract_hash(tmp_path / "one")
+    assert compiler._get_contract_hash(tmp_path / "two") == digest
+
+    write_contract(tmp_path / "two" / "pkg" / "b.py", "B = 2\n")
+    assert compiler._get_contract_hash(tmp_path / "two") != digest
+
+
+def test_import_scan_follows_local_modules(cache_dir, tmp_path):
+    contract = write_contract(
+        tmp_path / "contract.py",
+        "import near\nimport json\nfrom helpers import math\nfrom .local import x\n",
+    )
+    write_contract(tmp_path / "helpers" / "__init__.py", "")
+    write_contract(tmp_path / "helpers" / "math.py", "import requests\n")
+    write_contract(tmp_path / "local.py", "")
+    write_contract(tmp_path / "unrelated.py", "import nacl\n")
+
+    local_files, external_names = compiler._scan_imports(contract)
+
+    assert local_files == {
+        contract,
+        tmp_path / "helpers" / "__init__.py",
+        tmp_path / "helpers" / "math.py",
+        tmp_path / "local.py",
+    }
+    assert external_names == {"near", "requests"}
+
+
+def test_import_scan_resolves_namespace_packages(cache_dir, tmp_path):
+    contract = write_contract(
+        tmp_path / "contract.py", "from nsdir import mod\nimport nsdir.other\n"
+    )
+    write_contract(tmp_path / "nsdir" / "mod.py", "X = 1\n")
+    write_contract(tmp_path / "nsdir" / "other.py", "Y = 1\n")
+
+    local_files, external_names = compiler._scan_imports(contract)
+
+    assert tmp_path / "nsdir" / "mod.py" in local_files
+    assert tmp_path / "nsdir" / "other.py" in local_files
+    assert external_names == set()
+
+    # Editing the namespace package's module changes the cache key
+    key, _ = compiler._get_cache_key(contract, True, "imports")
+    write_contract(tmp_path / "nsdir" / "mod.py", "X = 2\n")
+    assert compiler._get_cache_key(contract, True, "imports")[0] != key
+
+
+def test_imports_mode_ignores_unrelated_files(cache_dir, tmp_path):
+    contract = write_contract(tmp_path / "contract.py", "import helper\n")
+    write_contract(tmp_path / "helper.py", "X = 1\n")
+    key, _ = compiler._get_cache_key(contract, True, "imports")
+
+    write_contract(tmp_path / "notes.py", "Y = 1\n")
+    assert compiler._get_cache_key(contract, True, "imports")[0] == key
+
+    write_contract(tmp_path / "helper.py", "X = 2\n")
+    assert compiler._get_cache_key(contract, True, "imports")[0] != key
+
+
+def test_imported_distributions_include_their_dependencies(monkeypatch, tmp_path):
+    installed = {
+        "app": ("app==1.0", ("lib-a",)),
+        "lib-a": ("lib_a==2.0", ("lib-b", "app")),
+        "lib-b": ("lib-b==3.1", ("missing",)),
+        "other": ("other==1.0", ()),
+    }
+    monkeypatch.setattr(compiler, "_get_installed_requirements", lambda _: installed)
+
+    assert compiler._with_requirements({"app==1.0"}, tmp_path) == {
+        "app==1.0",
+        "lib_a==2.0",
+        "lib-b==3.1",
+    }
+
+
+def test_installed_requirements_skip_extras():
+    installed = compiler._get_installed_requirements(compiler._get_venv_path())
+    package, requires = installed["requests"]
+
+    assert package.startswith("requests==")
+    assert "urllib3" in requires
+    assert "pysocks" not in requires
+
+
+def compile_aged(cache_dir, tmp_path, ages):
+    """Compile one contract per age, last used that many seconds ago"""
+    wasm_paths = [
+        compile_contract(
+            write_contract(tmp_path / f"c{i}" / "contract.py", f"X = {i}\n"),
+            single_file=True,
+        )
+        for i in range(len(ages))
+    ]
+    manifest_path = cache_dir / compiler.MANIFEST_FILENAME
+    manifest = json.loads(manifest_path.read_text())
+    for entry in manifest["entries"].values():
+        index = [path.name for path in wasm_paths].index(entry["wasm"])
+        entry["last_access"] = time.time() - ages[index]
+    manifest_path.write_text(json.dumps(manifest))
+    return wasm_paths
+
+
+def test_prune_cache_removes_old_artifacts(cache_dir, fake_nearc, tmp_path):
+    old, recent = compile_aged(cache_dir, tmp_path, [7200, 60])
+
+    assert prune_cache(max_age=3600) == [old]
+    assert not old.exists() and recent.exists()
+    manifest = json.loads((cache_dir / compiler.MANIFEST_FILENAME).read_text())
+    assert [entry["wasm"] for entry in manifest["entries"].values()] == [recent.name]
+
+
+def test_prune_cache_evicts_least_recently_used(cache_dir, fake_nearc, tmp_path):
+    wasm_paths = compile_aged(cache_dir, tmp_path, [30, 10, 20])
+    total = sum(path.stat().st_size for path in wasm_paths)
+
+    assert prune_cache(max_bytes=total - 1) == [wasm_paths[0]]
+    assert prune_cache(max_bytes=0, keep=wasm_paths[1]) == [wasm_paths[2]]
+    assert [path.exists() for path in wasm_paths] == [False, True, False]
+
+
+def test_prune_cache_dry_run_keeps_files(cache_dir, fake_nearc, tmp_path):
+    (old,) = compile_aged(cache_dir, tmp_path, [7200])
+    manifest = (cache_dir / compiler.MANIFEST_FILENAME).read_text()
+
+    assert prune_cache(max_age=3600, dry_run=True) == [old]
+    assert old.exists()
+    assert (cache_dir / compiler.MANIFEST_FILENAME).read_text() == manifest
+    assert list((cache_dir / "locks").glob("*.lock"))
+
+
+def test_prune_cache_removes_stale_builds(cache_dir, fake_nearc, tmp_path):
+    contract = write_contract(tmp_path / "contract.py")
+    wasm_path = compile_contract(contract, single_file=True)
+
+    assert prune_cache(stale=True) == []
+    write_contract(contract, "def get():\n    return 2\n")
+    assert prune_cache(stale=True) == [wasm_path]
+    assert not wasm_path.exists()
+
+
+def test_prune_cache_removes_unheld_lock_files(cache_dir, fake_nearc, tmp_path):
+    compile_aged(cache_dir, tmp_path, [0, 0])
+    held = compiler._get_lock_path(cache_dir, "held")
+
+    # Pruning itself holds the manifest lock and recreates the digest lock
+    in_use = {
+        held,
+        compiler._get_lock_path(cache_dir, compiler.MANIFEST_FILENAME),
+        compiler._get_lock_path(cache_dir, compiler.FILE_HASHES_FILENAME),
+    }
+    assert len(list((cache_dir / "locks").glob("*.lock"))) > 2
+    with file_lock(held):
+        prune_cache()
+        assert set((cache_dir / "locks").glob("*.lock")) == in_use
+    prune_cache()
+    assert not held.exists()
+
+    # Locks are recreated on demand
+    with file_lock(held):
+        assert held.exists()
+
+
+def test_prune_cache_forgets_digests_of_deleted_files(cache_dir, tmp_path):
+    kept = tmp_path / "kept.py"
+    kept.write_text("X = 1\n")
+    hashes_path = cache_dir / compiler.FILE_HASHES_FILENAME
+    hashes_path.write_text(
+        json.dumps(
+            {str(kept): [1, 2, 3, "aa"], str(tmp_path / "gone.py"): [1, 2, 3, "bb"]}
+        )
+    )
+
+    prune_cache(dry_run=True)
+    assert len(json.loads(hashes_path.read_text())) == 2
+    prune_cache()
+    assert list(json.loads(hashes_path.read_text())) == [str(kept)]
+
+
+def test_prune_cache_counts_bookkeeping_toward_size(cache_dir, fake_nearc, tmp_path):
+    (wasm_path,) = compile_aged(cache_dir, tmp_path, [0])
+    hashes_path = cache_dir / compiler.FILE_HASHES_FILENAME
+    hashes_path.write_text(json.dumps({str(tmp_path): [1, 2, 3, "a" * 64]}))
+
+    assert prune_cache(max_bytes=wasm_path.stat().st_size) == [wasm_path]
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [
+        ("1024", 1024),
+        ("2K", 2048),
+        ("500M", 500 << 20),
+        ("1.5G", 3 << 29),
+        ("2gib", 2 << 30),
+        (" 1TB ", 1 << 40),
+    ],
+)
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+@pytest.mark.parametrize("size", ["", "M", "lots", "5X"])
+def test_parse_size_rejects_invalid_sizes(size):
+    with pytest.raises(CompilerError):
+        parse_size(size)
@@ -0,0 +1,152 @@
+import pytest
+
+CONFTEST = """
+import pytest
+
+from near_pytest.fixtures import SandboxProxy
+
+EVENTS = []
+
+
+class FakeProxy(SandboxProxy):
+    def __init__(self):
+        self._isolation_snapshot = None
+        self._isolation_setups = 0
+        self.created = []
+
+    def save_snapshot(self):
+        EVENTS.append("save")
+        self.created = []
+        return object()
+
+    def restore_snapshot(self, snapshot, created=None):
+        EVENTS.append("restore")
+        if created is not None:
+            created.extend(self.created)
+        self.created = []
+        return True
+
+
+@pytest.fixture(scope="session")
+def sandbox():
+    return FakeProxy()
+
+
+@pytest.fixture(scope="module")
+def shared(sandbox):
+    return object()
+
+
+@pytest.fixture
+def temp_account(sandbox):
+    EVENTS.append("create account")
+    sandbox.created.append(("Account", "temp.test.near"))
+    yield
+    EVENTS.append("delete account")
+"""
+
+
+@pytest.fixture
+def isolated_tests(pytester):
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(
+        test_a="""
+        import pytest
+        from conftest import EVENTS
+
+        @pytest.mark.near_isolated
+        def test_one(sandbox):
+            sandbox.created.append(("Data", "counter.test.near", "a2V5"))
+
+        @pytest.mark.near_isolated
+        def test_two(sandbox):
+            pass
+
+        @pytest.mark.near_isolated
+        def test_three(sandbox, shared):
+            pass
+
+        def test_four(sandbox):
+            pass
+
+        @pytest.mark.near_isolated
+        def test_five(sandbox):
+            pass
+
+        def test_events():
+            assert EVENTS == [
+                "save", "restore", "restore", "save", "restore", "save", "restore"
+            ]
+        """
+    )
+    return pytester
+
+
+def test_snapshot_is_retaken_when_stale(isolated_tests):
+    result = isolated_tests.runpytest("-p", "no:cacheprovider")
+    result.assert_outcomes(passed=6, warnings=1)
+
+
+def test_created_entries_are_reported(isolated_tests):
+    result = isolated_tests.runpytest("-p", "no:cacheprovider")
+    result.stdout.fnmatch_lines(
+        ["*test_one*", "*created 1 state entries*Data/counter.test.near/a2V5*"]
+    )
+
+
+def test_function_scoped_fixtures_are_inside_the_snapshot(pytester):
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(
+        test_b="""
+        import pytest
+        from conftest import EVENTS
+
+        @pytest.mark.near_isolated
+        def test_one(sandbox, temp_account):
+            EVENTS.append("test")
+
+        @pytest.mark.near_isolated
+        def test_two(sandbox, temp_account):
+            EVENTS.append("test")
+
+        def test_events():
+            assert EVENTS == [
+                "save", "create account", "test", "delete account", "restore",
+                "create account", "test", "delete account", "restore",
+            ]
+        """
+    )
+    result = pytester.runpytest("-p", "no:cacheprovider")
+    # Every test reports the account its fixture created, the first included
+    result.assert_outcomes(passed=3, warnings=2)
+    result.stdout.fnmatch_lines(
+        ["*function-scoped fixtures created 1 state entries*temp.test.near*"] * 2
+    )
+
+
+@pytest.mark.parametrize("setting", ["ini", "marker"])
+def test_isolation_applies_only_to_sandbox_tests(pytester, setting):
+    pytester.makeconftest(CONFTEST)
+    if setting == "ini":
+        pytester.makeini("[pytest]\nnear_isolation = snapshot\n")
+        marker = ""
+    else:
+        marker = "@pytest.mark.near_isolated"
+    pytester.makepyfile(
+        test_c=f"""
+        import pytest
+        from conftest import EVENTS
+
+        {marker}
+        def test_plain():
+            pass
+
+        {marker}
+        def test_sandbox(sandbox):
+            pass
+
+        def test_events():
+            assert EVENTS == ["save", "restore"]
+        """
+    )
+    pytester.runpytest("-p", "no:cacheprovider").assert_outcomes(passed=3)
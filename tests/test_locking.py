@@ -0,0 +1,49 @@
+import threading
+import time
+
+from near_pytest import compiler
+from near_pytest.compiler import compile_contract
+from near_pytest.utils.locking import file_lock
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    lock_path = tmp_path / "locks" / "resource.lock"
+    events = []
+
+    def worker(name):
+        with file_lock(lock_path):
+            events.append(f"{name} in")
+            time.sleep(0.05)
+            events.append(f"{name} out")
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Critical sections never interleave
+    assert events[0][0] == events[1][0]
+    assert events[2][0] == events[3][0]
+
+
+def test_artifact_built_while_waiting_is_reused(cache_dir, fake_nearc, tmp_path):
+    contract = tmp_path / "contract.py"
+    contract.write_text("X = 1\n")
+    cache_key, _ = compiler._get_cache_key(contract.resolve(), True)
+    wasm_path = cache_dir / f"contract-{cache_key}.wasm"
+    result = []
+
+    # Another process holds the artifact lock and finishes the build
+    with file_lock(compiler._get_lock_path(cache_dir, wasm_path.name)):
+        thread = threading.Thread(
+            target=lambda: result.append(compile_contract(contract, single_file=True))
+        )
+        thread.start()
+        time.sleep(0.1)
+        assert not result
+        wasm_path.write_bytes(b"\0asm\x01\0\0\0")
+    thread.join()
+
+    assert result == [wasm_path]
+    assert fake_nearc == []
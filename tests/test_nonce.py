@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from near_pytest.nonce import BlockHashCache, NonceManager
+
+
+@pytest.fixture
+def account(make_client):
+    """A py-near account of a client served by the stub provider"""
+    client = make_client()
+    return asyncio.run(client._get_or_create_account("alice.test.near"))
+
+
+def test_next_counts_up_from_chain_nonce(account, stub_provider):
+    async def main():
+        manager = NonceManager()
+        pk = account._signers[0]
+        return await asyncio.gather(*(manager.next(account, pk) for _ in range(5)))
+
+    assert sorted(asyncio.run(main())) == [11, 12, 13, 14, 15]
+    assert stub_provider.access_key_fetches == 1
+
+
+def test_sync_seeds_pynear_counter(account, stub_provider, pynear_nonces):
+    async def main():
+        manager = NonceManager()
+        pk = account._signers[0]
+        await asyncio.gather(manager.sync(account, pk), manager.sync(account, pk))
+
+    asyncio.run(main())
+    assert stub_provider.access_key_fetches == 1
+    assert pynear_nonces[account._signers[0]] == 10
+
+
+def test_next_skips_nonces_used_by_pynear(account, pynear_nonces):
+    pk = account._signers[0]
+
+    async def main():
+        manager = NonceManager()
+        first = await manager.next(account, pk)
+        pynear_nonces[pk] += 3
+        return first, await manager.next(account, pk)
+
+    assert asyncio.run(main()) == (11, 15)
+    assert pynear_nonces[pk] == 15
+
+
+def test_resync_only_moves_forward(account, stub_provider):
+    pk = account._signers[0]
+
+    async def main():
+        manager = NonceManager()
+        await manager.next(account, pk)
+        await manager.next(account, pk)
+
+        # Reserved nonces that aren't on chain yet are not handed out again
+        await manager.resync(account, pk)
+        behind = await manager.next(account, pk)
+
+        stub_provider.chain_nonce = 20
+        await manager.resync(account, pk)
+        return behind, await manager.next(account, pk)
+
+    assert asyncio.run(main()) == (13, 21)
+
+
+def test_shared_table_and_reset(make_client, stub_provider, pynear_nonces):
+    client = make_client()
+    stub_provider.nonces["bob.test.near"] = 5
+
+    async def main():
+        account = await client._get_or_create_account("alice.test.near")
+        other_account = await client._get_or_create_account("bob.test.near")
+        pk, other_pk = account._signers[0], other_account._signers[0]
+        nonces = {}
+        first, second = NonceManager(nonces), NonceManager(nonces)
+
+        a = await first.next(account, pk)
+        b = await second.next(account, pk)
+        c = await second.next(other_account, other_pk)
+        fetches = stub_provider.access_key_fetches
+
+        pynear_nonces.clear()
+        stub_provider.chain_nonce = 3
+        first.reset()
+        return [a, b, c, await second.next(account, pk)], fetches
+
+    nonces, fetches = asyncio.run(main())
+    assert nonces == [11, 12, 6, 4]
+    assert fetches == 2
+
+
+def test_block_hash_is_fetched_once_and_reused(stub_provider):
+    async def main():
+        cache = BlockHashCache(ttl=60)
+        hashes = await asyncio.gather(*(cache.get(stub_provider) for _ in range(5)))
+        stub_provider.height += 1
+        hashes.append(await cache.get(stub_provider))
+        return hashes, cache.height
+
+    hashes, height = asyncio.run(main())
+    assert set(hashes) == {b"\1" * 32}
+    assert stub_provider.status_calls == height == 1
+
+
+def test_block_hash_expires_and_invalidates(stub_provider):
+    async def main():
+        expiring = BlockHashCache(ttl=0)
+        await expiring.get(stub_provider)
+        stub_provider.height += 1
+        expired = await expiring.get(stub_provider)
+
+        cache = BlockHashCache(ttl=60)
+        await cache.get(stub_provider)
+        stub_provider.height += 1
+        cache.invalidate()
+        return expired, await cache.get(stub_provider), cache.height
+
+    assert asyncio.run(main()) == (b"\2" * 32, b"\3" * 32, 3)
@@ -0,0 +1,110 @@
+import pytest
+
+from near_pytest import pool as pool_module
+from near_pytest.pool import SandboxPool
+
+
+class FakeSandbox:
+    """Stands in for SandboxManager, recording lifecycle calls"""
+
+    def __init__(self, home_dir):
+        self.home_dir = home_dir
+        self.home_dir.mkdir()
+        self.starts = []
+        self.resets = 0
+        self.stopped = False
+        self.fail_start = False
+
+    def start(self, wait=True):
+        if wait and self.fail_start:
+            raise RuntimeError("sandbox died")
+        self.starts.append(wait)
+
+    def reset_state(self, wait=True):
+        self.resets += 1
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def sandboxes(tmp_path, monkeypatch):
+    created = []
+
+    def factory():
+        sandbox = FakeSandbox(tmp_path / f"sandbox-{len(created)}")
+        created.append(sandbox)
+        return sandbox
+
+    monkeypatch.setattr(pool_module, "SandboxManager", factory)
+    return created
+
+
+def test_unpooled_lease_starts_and_release_discards(sandboxes):
+    pool = SandboxPool(size=0)
+
+    sandbox = pool.acquire()
+    assert sandbox.starts == [False, True]
+    assert len(sandboxes) == 1
+
+    pool.release(sandbox)
+    assert sandbox.stopped
+    assert not sandbox.home_dir.exists()
+
+
+def test_lease_prewarms_replacements(sandboxes):
+    pool = SandboxPool(size=3)
+
+    leased = pool.acquire()
+    assert len(sandboxes) == 3
+    assert all(sandbox.starts == [False] for sandbox in sandboxes[1:])
+
+    # Warm sandboxes are leased before new ones are launched
+    second = pool.acquire()
+    assert second is sandboxes[1]
+    assert len(sandboxes) == 3
+    pool.release(second)
+    pool.release(leased)
+
+
+def test_release_resets_and_reuses_sandbox(sandboxes):
+    pool = SandboxPool(size=1)
+
+    sandbox = pool.acquire()
+    (sandbox.home_dir / "checkpoints").mkdir()
+    pool.release(sandbox)
+    assert sandbox.resets == 1
+    assert not sandbox.stopped
+    assert not (sandbox.home_dir / "checkpoints").exists()
+
+    assert pool.acquire() is sandbox
+    assert len(sandboxes) == 1
+
+
+def test_release_beyond_size_discards(sandboxes):
+    pool = SandboxPool(size=1)
+
+    first = pool.acquire()
+    second = pool.acquire()
+    # While the other lease is out, the pool is already full
+    pool.release(first)
+    assert first.stopped
+    pool.release(second)
+    assert not second.stopped
+    pool.shutdown()
+    assert all(sandbox.stopped for sandbox in sandboxes)
+
+
+def test_failed_start_is_discarded(sandboxes, monkeypatch):
+    pool = SandboxPool(size=0)
+    original = FakeSandbox.start
+
+    def start(self, wait=True):
+        self.fail_start = True
+        original(self, wait)
+
+    monkeypatch.setattr(FakeSandbox, "start", start)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert sandboxes[0].stopped
+    assert pool._leased == 0
@@ -0,0 +1,120 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from near_pytest import remote_cache
+from near_pytest.compiler import compile_contract
+from near_pytest.remote_cache import (
+    CacheBackend,
+    DirectoryCacheBackend,
+    HttpCacheBackend,
+)
+
+WASM = b"\0asm\x01\0\0\0"
+
+
+@pytest.fixture
+def http_store():
+    """A local HTTP cache server, yielding its URL and stored artifacts"""
+    store = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = store.get(self.path)
+            self.send_response(404 if body is None else 200)
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+        def do_PUT(self):
+            store[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(201)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/cache", store
+    server.shutdown()
+    server.server_close()
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()  # type: ignore[abstract]
+
+
+def test_directory_backend_round_trip(tmp_path):
+    backend = DirectoryCacheBackend(tmp_path / "shared")
+    source = tmp_path / "contract.wasm"
+    source.write_bytes(WASM)
+    destination = tmp_path / "fetched.wasm"
+
+    assert not backend.fetch("abc", destination)
+    backend.publish("abc", source)
+    assert backend.fetch("abc", destination)
+    assert destination.read_bytes() == WASM
+
+
+def test_directory_backend_rejects_invalid_wasm(tmp_path):
+    backend = DirectoryCacheBackend(tmp_path)
+    (tmp_path / "abc.wasm").write_bytes(b"<html>")
+    destination = tmp_path / "out" / "fetched.wasm"
+    destination.parent.mkdir()
+
+    with pytest.raises(ValueError):
+        backend.fetch("abc", destination)
+    assert list(destination.parent.iterdir()) == []
+
+
+def test_http_backend_round_trip(http_store, tmp_path):
+    url, store = http_store
+    backend = HttpCacheBackend(url + "/")
+    source = tmp_path / "contract.wasm"
+    source.write_bytes(WASM)
+    destination = tmp_path / "fetched.wasm"
+
+    assert not backend.fetch("abc", destination)
+    backend.publish("abc", source)
+    assert store == {"/cache/abc.wasm": WASM}
+    assert backend.fetch("abc", destination)
+    assert destination.read_bytes() == WASM
+
+
+def test_http_backend_rejects_invalid_wasm(http_store, tmp_path):
+    url, store = http_store
+    store["/cache/abc.wasm"] = b"<html>"
+
+    with pytest.raises(ValueError):
+        HttpCacheBackend(url).fetch("abc", tmp_path / "fetched.wasm")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_http_backend_removes_temp_file_on_failure(http_store, tmp_path):
+    url, store = http_store
+    store["/cache/abc.wasm"] = WASM
+    destination = tmp_path / "fetched.wasm"
+    destination.mkdir()
+
+    with pytest.raises(OSError):
+        HttpCacheBackend(url).fetch("abc", destination)
+    assert list(tmp_path.iterdir()) == [destination]
+
+
+def test_compile_uses_and_fills_remote_cache(cache_dir, fake_nearc, tmp_path):
+    shared = tmp_path / "shared"
+    remote_cache.set_remote_cache(DirectoryCacheBackend(shared))
+    contract = tmp_path / "contract.py"
+    contract.write_text("X = 1\n")
+
+    wasm_path = compile_contract(contract, single_file=True)
+    assert [path.name for path in shared.iterdir()] == [
+        f"{wasm_path.stem.split('-')[-1]}.wasm"
+    ]
+
+    wasm_path.unlink()
+    assert compile_contract(contract, single_file=True) == wasm_path
+    assert len(fake_nearc) == 1
@@ -0,0 +1,209 @@
+import io
+import os
+import shutil
+import time
+
+import pytest
+
+from near_pytest.sandbox import INIT_ARGS, SandboxError, SandboxManager, _link_or_copy
+
+
+def launched_sandbox(tmp_path, monkeypatch, running):
+    """A sandbox as left by start(wait=False), with a scripted is_running()"""
+    sandbox = SandboxManager(home_dir=tmp_path, port=1)
+    # Restored to None on teardown, so the atexit stop() has nothing to do
+    monkeypatch.setattr(sandbox, "_process", object())
+    sandbox._launch_time = time.monotonic()
+    monkeypatch.setattr(sandbox, "is_running", lambda: running.pop(0))
+    return sandbox
+
+
+def test_startup_time_of_warm_sandbox_excludes_idle_time(tmp_path, monkeypatch):
+    sandbox = launched_sandbox(tmp_path, monkeypatch, [True])
+    sandbox._read_output(io.BytesIO(b"booting\nINFO: RPC server started\n"))
+    assert sandbox._ready_event.is_set()
+
+    # A pre-launched sandbox is only started again when it is leased
+    time.sleep(0.2)
+    sandbox.start()
+
+    assert sandbox.startup_time is not None
+    assert sandbox.startup_time < 0.1
+
+
+def test_startup_time_of_booting_sandbox(tmp_path, monkeypatch):
+    sandbox = launched_sandbox(tmp_path, monkeypatch, [False, False, True])
+    sandbox.start()
+
+    assert sandbox.startup_time is not None
+    assert sandbox.startup_time > 0
+
+
+def test_startup_time_is_kept_once_measured(tmp_path, monkeypatch):
+    sandbox = launched_sandbox(tmp_path, monkeypatch, [False, True, True])
+    sandbox.start()
+    startup_time = sandbox.startup_time
+
+    time.sleep(0.05)
+    sandbox.start()
+    assert sandbox.startup_time == startup_time
+
+
+def fake_sandbox(tmp_path, binary, name="home"):
+    """A sandbox whose init command just writes a validator key"""
+    sandbox = SandboxManager(home_dir=tmp_path / name, port=1)
+    sandbox._binary_path = str(binary)
+    sandbox.init_homes = []
+
+    def run_command(args, home_dir=None):
+        assert args == INIT_ARGS
+        sandbox.init_homes.append(home_dir)
+        (home_dir / "validator_key.json").write_text('{"secret_key": "key"}')
+
+    sandbox._run_command = run_command
+    return sandbox
+
+
+@pytest.fixture
+def binary(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "user"))
+    binary = tmp_path / "near-sandbox"
+    binary.write_bytes(b"v1")
+    return binary
+
+
+def test_home_template_is_initialized_once_per_binary(tmp_path, binary):
+    first = fake_sandbox(tmp_path, binary, "first")
+    second = fake_sandbox(tmp_path, binary, "second")
+
+    template_dir = first._get_home_template()
+    assert second._get_home_template() == template_dir
+    assert len(first.init_homes) == 1 and second.init_homes == []
+    assert template_dir.parent == tmp_path / "user" / ".near-pytest" / "templates"
+    assert [path.name for path in template_dir.parent.iterdir()] == [template_dir.name]
+
+    # A different binary gets its own template
+    binary.write_bytes(b"version 2")
+    assert second._get_home_template() != template_dir
+    assert len(second.init_homes) == 1
+
+    second._init_home()
+    assert second.get_validator_key() == "key"
+
+
+def test_home_template_race_lost_to_another_process(tmp_path, binary):
+    sandbox = fake_sandbox(tmp_path, binary)
+    template_dir = fake_sandbox(tmp_path, binary)._get_home_template()
+    shutil.rmtree(template_dir)
+    fake_run_command = sandbox._run_command
+
+    def run_command(args, home_dir=None):
+        fake_run_command(args, home_dir)
+        # Another process moves its template into place meanwhile
+        template_dir.mkdir()
+        (template_dir / "validator_key.json").write_text('{"secret_key": "other"}')
+
+    sandbox._run_command = run_command
+    assert sandbox._get_home_template() == template_dir
+    assert (template_dir / "validator_key.json").read_text() == (
+        '{"secret_key": "other"}'
+    )
+    # The scratch directory is cleaned up
+    assert list(template_dir.parent.iterdir()) == [template_dir]
+
+
+def test_home_template_rename_failure_is_raised(tmp_path, binary, monkeypatch):
+    sandbox = fake_sandbox(tmp_path, binary)
+
+    def rename(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(os, "rename", rename)
+    with pytest.raises(PermissionError):
+        sandbox._get_home_template()
+    assert list((tmp_path / "user" / ".near-pytest" / "templates").iterdir()) == []
+
+
+@pytest.fixture
+def data_sandbox(tmp_path, monkeypatch):
+    """A stopped sandbox with a data directory and fake start/stop"""
+    sandbox = SandboxManager(home_dir=tmp_path / "home", port=1)
+    data_dir = sandbox.home_dir / "data"
+    data_dir.mkdir(parents=True)
+    (data_dir / "000001.sst").write_bytes(b"table")
+    (data_dir / "blobs").mkdir()
+    (data_dir / "blobs" / "000002.blob").write_bytes(b"blob")
+    (data_dir / "MANIFEST-000003").write_bytes(b"manifest")
+    sandbox.events = []
+    monkeypatch.setattr(sandbox, "start", lambda: sandbox.events.append("start"))
+    monkeypatch.setattr(sandbox, "stop", lambda: sandbox.events.append("stop"))
+    return sandbox
+
+
+def test_checkpoint_links_immutable_files_and_copies_others(data_sandbox):
+    data_dir = data_sandbox.home_dir / "data"
+    data_sandbox.checkpoint("ready")
+
+    checkpoint_dir = data_sandbox.home_dir / "checkpoints" / "ready"
+    assert data_sandbox.events == ["stop", "start"]
+    for name in ("000001.sst", "blobs/000002.blob"):
+        assert os.path.samefile(checkpoint_dir / name, data_dir / name)
+    manifest = checkpoint_dir / "MANIFEST-000003"
+    assert manifest.read_bytes() == b"manifest"
+    assert not os.path.samefile(manifest, data_dir / "MANIFEST-000003")
+
+
+def test_restore_replaces_data_directory(data_sandbox):
+    data_dir = data_sandbox.home_dir / "data"
+    data_sandbox.checkpoint("ready")
+
+    # The node writes new tables and rewrites its manifest
+    (data_dir / "000004.sst").write_bytes(b"later")
+    (data_dir / "MANIFEST-000003").write_bytes(b"changed")
+    data_sandbox.restore("ready")
+
+    assert data_sandbox.events == ["stop", "start", "stop", "start"]
+    assert sorted(str(path.relative_to(data_dir)) for path in data_dir.rglob("*")) == [
+        "000001.sst",
+        "MANIFEST-000003",
+        "blobs",
+        "blobs/000002.blob",
+    ]
+    assert (data_dir / "MANIFEST-000003").read_bytes() == b"manifest"
+
+
+def test_checkpoint_overwrites_same_name(data_sandbox):
+    data_sandbox.checkpoint("ready")
+    (data_sandbox.home_dir / "data" / "000004.sst").write_bytes(b"later")
+    data_sandbox.checkpoint("ready")
+
+    checkpoint_dir = data_sandbox.home_dir / "checkpoints" / "ready"
+    assert (checkpoint_dir / "000004.sst").exists()
+
+
+def test_restore_of_missing_checkpoint_fails(data_sandbox):
+    with pytest.raises(SandboxError, match="Checkpoint not found"):
+        data_sandbox.restore("missing")
+    assert data_sandbox.events == []
+
+
+@pytest.mark.parametrize("name", ["", ".", "..", "../x", "a/b", "/tmp/x"])
+def test_checkpoint_names_are_validated(data_sandbox, name):
+    with pytest.raises(SandboxError, match="Invalid checkpoint name"):
+        data_sandbox.checkpoint(name)
+    with pytest.raises(SandboxError, match="Invalid checkpoint name"):
+        data_sandbox.restore(name)
+    assert data_sandbox.events == []
+
+
+def test_link_or_copy_falls_back_to_copy(tmp_path, monkeypatch):
+    source = tmp_path / "000001.sst"
+    source.write_bytes(b"table")
+
+    def link(src, dst):
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr(os, "link", link)
+    _link_or_copy(source, tmp_path / "copy.sst")
+    assert (tmp_path / "copy.sst").read_bytes() == b"table"
+    assert not os.path.samefile(source, tmp_path / "copy.sst")
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from near_pytest import state
+from near_pytest.sandbox import SandboxManager
+from near_pytest.state import StateSnapshot, iter_records, record_key
+
+RECORDS = [
+    state.account_record("alice.test.near", 10**24),
+    state.access_key_record("alice.test.near", "ed25519:alice"),
+    state.data_record("counter.test.near", "count", "5"),
+    state.account_record("bob.test.near", 5 * 10**24),
+]
+
+
+def write_state(path, records=RECORDS, **fields):
+    # Fields around the records array must be skipped, nested values included
+    document = {"config": {"nested": [1, {"a": "]"}]}, "records": records, **fields}
+    path.write_text(json.dumps(document, indent=1))
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, state.STREAM_CHUNK_SIZE])
+def test_iter_records_across_chunk_boundaries(tmp_path, monkeypatch, chunk_size):
+    monkeypatch.setattr(state, "STREAM_CHUNK_SIZE", chunk_size)
+    path = write_state(tmp_path / "state.json", trailer={"x": 1})
+
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_iter_records_filters(tmp_path, monkeypatch):
+    monkeypatch.setattr(state, "STREAM_CHUNK_SIZE", 5)
+    path = write_state(tmp_path / "state.json")
+
+    assert list(iter_records(path, account_ids={"alice.test.near"})) == RECORDS[:2]
+    assert list(iter_records(path, record_types={"Account"})) == [
+        RECORDS[0],
+        RECORDS[3],
+    ]
+
+
+def test_iter_records_empty_and_missing_records(tmp_path):
+    assert list(iter_records(write_state(tmp_path / "empty.json", []))) == []
+
+    path = tmp_path / "none.json"
+    path.write_text('{"config": {}}')
+    assert list(iter_records(path)) == []
+
+
+def test_iter_records_rejects_truncated_input(tmp_path):
+    path = tmp_path / "truncated.json"
+    path.write_text(json.dumps({"records": RECORDS})[:-20])
+
+    with pytest.raises(ValueError):
+        list(iter_records(path))
+
+
+def test_snapshot_state_streams_records(tmp_path, monkeypatch):
+    sandbox = SandboxManager(home_dir=tmp_path, port=1)
+    monkeypatch.setattr(sandbox, "genesis_records", lambda: {})
+    monkeypatch.setattr(sandbox, "iter_state", lambda: iter(RECORDS))
+    monkeypatch.setattr(
+        sandbox, "dump_state", lambda: pytest.fail("dump_state loads all records")
+    )
+
+    assert len(sandbox.snapshot_state()) == len(RECORDS)
+
+
+def keyed(records):
+    return {record_key(record): record for record in records}
+
+
+def test_snapshot_keeps_only_changes_from_baseline():
+    genesis = keyed(RECORDS)
+    funded = state.account_record("alice.test.near", 2 * 10**24)
+    added = state.data_record("counter.test.near", "owner", "alice")
+
+    snapshot = StateSnapshot.from_records([funded, *RECORDS[1:], added], genesis)
+
+    assert len(snapshot) == 2
+    assert snapshot.get(record_key(funded)) == funded
+    assert snapshot.get(record_key(RECORDS[3])) == RECORDS[3]
+    assert snapshot.get(record_key(state.data_record("x", "y", "z"))) is None
+
+
+def test_restore_records_patches_changed_and_removed_entries():
+    snapshot = StateSnapshot.from_records(RECORDS, keyed(RECORDS))
+    changed = state.data_record("counter.test.near", "count", "9")
+
+    # The Data entry changed and bob's account disappeared
+    patch = snapshot.restore_records([RECORDS[0], RECORDS[1], changed])
+
+    assert sorted(patch, key=record_key) == sorted(
+        [RECORDS[2], RECORDS[3]], key=record_key
+    )
+    assert snapshot.restore_records(RECORDS) == []
+
+
+def test_record_key_identifies_state_entries():
+    assert record_key(RECORDS[1]) == ("AccessKey", "alice.test.near", "ed25519:alice")
+    assert record_key(RECORDS[2]) == (
+        "Data",
+        "counter.test.near",
+        RECORDS[2]["Data"]["data_key"],
+    )
+
+
+def test_restore_records_never_rewinds_access_key_nonces():
+    key = state.access_key_record("test.near", "ed25519:master", nonce=5)
+    snapshot = StateSnapshot.from_records([key], {})
+
+    used = state.access_key_record("test.near", "ed25519:master", nonce=9)
+    assert snapshot.restore_records([used]) == []
+
+    # Other changes to the key are restored, keeping the current nonce
+    limited = {"AccessKey": {**used["AccessKey"], "access_key": {"nonce": 9}}}
+    assert snapshot.restore_records([limited]) == [used]
+
+
+def test_restore_records_reports_created_entries():
+    snapshot = StateSnapshot.from_records(RECORDS, keyed(RECORDS))
+    storage = state.data_record("counter.test.near", "new", "1")
+    account = state.account_record("carol.test.near", 1)
+    created = []
+
+    patch = snapshot.restore_records([*RECORDS, storage, account], created)
+
+    assert patch == []
+    assert created == [record_key(storage), record_key(account)]
+
+
+def test_restore_records_keeps_entries_deleted_before_snapshot():
+    # bob's account was already deleted when the snapshot was taken
+    snapshot = StateSnapshot.from_records(RECORDS[:3], keyed(RECORDS))
+    bob = record_key(RECORDS[3])
+
+    assert snapshot.changes == {bob: None}
+    assert snapshot.get(bob) is None
+    assert snapshot.restore_records(RECORDS[:3]) == []
+
+    # Recreated since the snapshot: reported, as patching can't delete it
+    created = []
+    assert snapshot.restore_records(RECORDS, created) == []
+    assert created == [bob]
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from near_pytest.view_cache import ViewCache
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(view_cache=ViewCache(height_check_interval=0))
+
+
+def test_key_canonicalizes_args():
+    assert ViewCache.key("c", "m", None) == ViewCache.key("c", "m", {})
+    assert ViewCache.key("c", "m", {"a": 1, "b": 2}) == ViewCache.key(
+        "c", "m", {"b": 2, "a": 1}
+    )
+    assert ViewCache.key("c", "m", {"a": 1}) != ViewCache.key("c", "m", {"a": 2})
+    assert ViewCache.key("c", "m", None) != ViewCache.key("c", "other", None)
+
+
+def test_results_are_copied():
+    cache = ViewCache()
+    key = ViewCache.key("c", "m", None)
+    result = {"items": [1]}
+    cache.put(key, result, cache.generation)
+    result["items"].append(2)
+
+    cached, value = cache.get(key)
+    assert cached and value == {"items": [1]}
+    value["items"].append(3)
+    assert cache.get(key) == (True, {"items": [1]})
+    assert cache.get(ViewCache.key("c", "m", {"a": 1})) == (False, None)
+
+
+def test_results_racing_an_invalidation_are_not_stored():
+    cache = ViewCache()
+    key = ViewCache.key("c", "m", None)
+    generation = cache.generation
+    cache.invalidate()
+    cache.put(key, 1, generation)
+    assert cache.get(key) == (False, None)
+
+
+def test_refresh_drops_entries_when_height_advances(stub_provider):
+    async def main():
+        provider = stub_provider
+        cache = ViewCache(height_check_interval=0)
+        key = ViewCache.key("c", "m", None)
+        await cache.refresh(provider)
+        cache.put(key, 1, cache.generation)
+
+        await cache.refresh(provider)
+        same_height = cache.get(key)
+        provider.height += 1
+        await cache.refresh(provider)
+        return same_height, cache.get(key)
+
+    assert asyncio.run(main()) == ((True, 1), (False, None))
+
+
+def test_refresh_checks_height_at_most_once_per_interval(stub_provider):
+    async def main():
+        cache = ViewCache(height_check_interval=60)
+        for _ in range(3):
+            await cache.refresh(stub_provider)
+
+    asyncio.run(main())
+    assert stub_provider.status_calls == 1
+
+
+def test_client_reuses_views_until_height_advances(client, stub_provider):
+    async def main():
+        first = await client.view_function("c.test.near", "get", {"a": 1, "b": 2})
+        second = await client.view_function("c.test.near", "get", {"b": 2, "a": 1})
+        stub_provider.height += 1
+        third = await client.view_function("c.test.near", "get", {"a": 1, "b": 2})
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert first == second == third
+    assert stub_provider.view_calls == 2
+
+
+def test_client_drops_views_when_it_changes_state(client):
+    async def main():
+        counts = [(await client.view_function("c.test.near", "get"))["count"]]
+        await client.call_function("test.near", "c.test.near", "increment")
+        counts.append((await client.view_function("c.test.near", "get"))["count"])
+        await client.patch_state([])
+        counts.append((await client.view_function("c.test.near", "get"))["count"])
+        return counts
+
+    assert asyncio.run(main()) == [0, 1, 2]
+
+
+def test_client_does_not_store_views_racing_a_state_change(client, stub_provider):
+    # The view is read right away but answers after the patch landed
+    stub_provider.read_delays = [0, 0.05]
+
+    async def patch_later():
+        await asyncio.sleep(0.01)
+        await client.patch_state([])
+
+    async def main():
+        stale, _ = await asyncio.gather(
+            client.view_function("c.test.near", "get"), patch_later()
+        )
+        fresh = await client.view_function("c.test.near", "get")
+        return stale["count"], fresh["count"]
+
+    assert asyncio.run(main()) == (0, 1)
+    assert stub_provider.view_calls == 2
@@ -0,0 +1,77 @@
+import pytest
+
+from near_pytest import wasm
+from near_pytest.wasm import WASM_HEADER, optimize_wasm, strip_custom_sections
+
+
+def section(section_id, payload):
+    """Encode a WASM section with a LEB128 size"""
+    size = bytearray()
+    remaining = len(payload)
+    while True:
+        byte = remaining & 0x7F
+        remaining >>= 7
+        size.append(byte | (0x80 if remaining else 0))
+        if not remaining:
+            return bytes([section_id]) + bytes(size) + payload
+
+
+def custom_section(name, payload=b""):
+    return section(0, bytes([len(name)]) + name + payload)
+
+
+TYPE = section(1, b"\x01\x60\x00\x00")
+FUNCTION = section(3, b"\x01\x00")
+CODE = section(10, b"\x01\x02\x00\x0b")
+
+
+def test_strip_custom_sections_keeps_other_sections():
+    module = (
+        WASM_HEADER
+        + custom_section(b"producers", b"\x00")
+        + TYPE
+        + FUNCTION
+        + custom_section(b"name", b"\x01" * 200)
+        + CODE
+        + custom_section(b".debug_info")
+    )
+    assert strip_custom_sections(module) == WASM_HEADER + TYPE + FUNCTION + CODE
+
+
+def test_strip_custom_sections_reads_multibyte_sizes():
+    data = section(11, b"\x00" * 300)
+    module = WASM_HEADER + custom_section(b"name", b"\x00" * 1000) + data
+    assert data[1:3] == b"\xac\x02"
+    assert strip_custom_sections(module) == WASM_HEADER + data
+
+
+def test_strip_custom_sections_without_custom_sections():
+    module = WASM_HEADER + TYPE + FUNCTION + CODE
+    assert strip_custom_sections(module) == module
+    assert strip_custom_sections(WASM_HEADER) == WASM_HEADER
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        b"",
+        b"\0asm\x02\0\0\0",
+        b"not a module",
+        WASM_HEADER + TYPE[:-1],
+        WASM_HEADER + b"\x01",
+        WASM_HEADER + b"\x01\x80",
+    ],
+)
+def test_strip_custom_sections_rejects_invalid_modules(module):
+    with pytest.raises(ValueError):
+        strip_custom_sections(module)
+
+
+def test_optimize_wasm_without_wasm_opt(tmp_path, monkeypatch):
+    monkeypatch.setattr(wasm, "get_wasm_opt_version", lambda: None)
+    source = tmp_path / "contract.wasm"
+    source.write_bytes(WASM_HEADER + TYPE + custom_section(b"name") + CODE)
+    destination = tmp_path / "optimized.wasm"
+
+    optimize_wasm(source, destination)
+    assert destination.read_bytes() == WASM_HEADER + TYPE + CODE